@@ -0,0 +1,8 @@
+"""Process bootstrap: load the .env file exactly once."""
+
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+# Module import runs once per process, so the .env file is parsed once.
+load_dotenv(Path(__file__).parent / ".env")
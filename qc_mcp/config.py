@@ -1,29 +1,148 @@
 """Configuration constants for the strategy pipeline."""
 
 import os
-from dotenv import load_dotenv
+from pathlib import Path
+from dataclasses import dataclass, field
 
-load_dotenv()
+import _bootstrap  # noqa: F401  (loads .env before settings are read)
+
+
+def _env(name: str, default: str | None = None):
+    return field(default_factory=lambda: os.environ.get(name, default))
+
+
+def _env_int(name: str, default: int):
+    return field(default_factory=lambda: int(os.environ.get(name, default)))
+
+
+def _env_flag(name: str):
+    return field(default_factory=lambda: os.environ.get(name, "").lower() in ("1", "true", "yes"))
+
+
+@dataclass(frozen=True)
+class Settings:
+    """Environment-backed settings, read once at import."""
+    # Model Configuration
+    openai_model: str = _env("OPENAI_MODEL", "gpt-5.2")
+
+    # Agent Limits
+    max_agent_turns: int = _env_int("MAX_AGENT_TURNS", 40)
+    agent_timeout: int = _env_int("AGENT_TIMEOUT", 800)
+    spec_timeout: int = _env_int("SPEC_TIMEOUT", 120)
+    code_timeout: int = _env_int("CODE_TIMEOUT", 180)
+    exec_timeout: int = _env_int("EXEC_TIMEOUT", 800)
+    backtest_poll_timeout: int = _env_int("BACKTEST_POLL_TIMEOUT", 600)
+
+    # Logging
+    log_level: str = _env("LOG_LEVEL", "INFO")
+
+    # Retry Limits
+    max_compile_attempts: int = _env_int("MAX_COMPILE_ATTEMPTS", 3)
+    max_revision_attempts: int = _env_int("MAX_REVISION_ATTEMPTS", 3)
+    max_parallel_strategies: int = _env_int("MAX_PARALLEL_STRATEGIES", 3)
+
+    # QuantConnect Project Settings
+    qc_project_name: str = _env("QC_PROJECT_NAME", "SPX_0DTE_Strategy")
+    strategy_task: str | None = _env("STRATEGY_TASK")
+    seen_errors_path: str = _env(
+        "SEEN_ERRORS_PATH", str(Path(__file__).parent / ".seen_errors.json")
+    )
+    compile_cache_path: str = _env(
+        "COMPILE_CACHE_PATH", str(Path(__file__).parent / ".compile_cache.json")
+    )
+
+    # QuantConnect Credentials / Docker
+    qc_user_id: str | None = _env("QUANTCONNECT_USER_ID")
+    qc_api_token: str | None = _env("QUANTCONNECT_API_TOKEN")
+    docker_platform: str | None = _env("DOCKER_PLATFORM")
+
+    # Long-lived MCP container reached through `docker exec` (skips cold start)
+    reuse_mcp_container: bool = _env_flag("REUSE_MCP_CONTAINER")
+    mcp_container_name: str = _env("MCP_CONTAINER_NAME", "qc-mcp-server")
+    mcp_exec_command: str | None = _env("MCP_EXEC_COMMAND")
+
+    def require_qc_credentials(self) -> tuple[str, str]:
+        """Return (user_id, api_token) or raise if either is missing."""
+        if not self.qc_user_id or not self.qc_api_token:
+            raise RuntimeError(
+                "Missing credentials. Set QUANTCONNECT_USER_ID and "
+                "QUANTCONNECT_API_TOKEN environment variables."
+            )
+        return self.qc_user_id, self.qc_api_token
+
+
+settings = Settings()
 
 # Model Configuration
-OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-5.2")
+OPENAI_MODEL = settings.openai_model
 
 # Agent Limits
-MAX_AGENT_TURNS = int(os.getenv("MAX_AGENT_TURNS", "40"))
-AGENT_TIMEOUT = int(os.getenv("AGENT_TIMEOUT", "800"))
+MAX_AGENT_TURNS = settings.max_agent_turns
+AGENT_TIMEOUT = settings.agent_timeout
+
+# Per-phase budgets (seconds). Exec covers compile + backtest polling, so its
+# default must stay above BACKTEST_POLL_TIMEOUT.
+SPEC_TIMEOUT = settings.spec_timeout
+CODE_TIMEOUT = settings.code_timeout
+EXEC_TIMEOUT = settings.exec_timeout
+
+# Backtest Polling (exponential backoff, bounded by BACKTEST_POLL_TIMEOUT)
+BACKTEST_POLL_TIMEOUT = settings.backtest_poll_timeout
+POLL_INITIAL_DELAY = 0.5
+POLL_MAX_DELAY = 10.0
+POLL_BACKOFF = 1.6
+
+# Logging
+LOG_LEVEL = settings.log_level.upper()
 
 # Retry Limits
-MAX_COMPILE_ATTEMPTS = int(os.getenv("MAX_COMPILE_ATTEMPTS", "3"))
-MAX_REVISION_ATTEMPTS = int(os.getenv("MAX_REVISION_ATTEMPTS", "3"))
+MAX_COMPILE_ATTEMPTS = settings.max_compile_attempts
+MAX_REVISION_ATTEMPTS = settings.max_revision_attempts
+
+# Strategies run at once by run_parallel_strategies (one shared MCP session)
+MAX_PARALLEL_STRATEGIES = settings.max_parallel_strategies
 
 # QuantConnect Project Settings
-DEFAULT_PROJECT_NAME = os.getenv("QC_PROJECT_NAME", "SPX_0DTE_Strategy")
+DEFAULT_PROJECT_NAME = settings.qc_project_name
 DEFAULT_MAIN_FILE = "main.py"
 
-# Relevant MCP tools
-QC_TOOLS = [
+# Compile-error hashes already sent to the Code Agent, persisted per project
+SEEN_ERRORS_PATH = Path(settings.seen_errors_path)
+
+# Terminal compile results keyed by project + source hash, persisted across
+# runs; QC compile artifacts are not kept forever, so entries expire
+COMPILE_CACHE_PATH = Path(settings.compile_cache_path)
+COMPILE_CACHE_TTL = 24 * 3600.0
+
+# Read-only MCP tools served from the in-process cache, and the writes that
+# invalidate cached reads for their project
+READ_ONLY_TOOLS = frozenset({
+    "read_project",
+    "read_file",
+    "read_compile",
+    "read_backtest",
+    "read_backtest_orders",
+    "read_backtest_insights",
+})
+WRITE_TOOLS = frozenset({
+    "create_project",
+    "update_project",
+    "delete_project",
+    "create_file",
+    "update_file_contents",
+    "create_compile",
+    "create_backtest",
+})
+TOOL_CACHE_SIZE = 256
+TOOL_CACHE_TTL = 300.0
+
+# Largest arguments_json accepted from an agent tool call (characters)
+MAX_ARGUMENTS_JSON_CHARS = 256_000
+
+# Relevant MCP tools (tuple: immutable, keeps the display order)
+QC_TOOLS = (
     "create_project",
-    "read_project", 
+    "read_project",
     "update_project",
     "delete_project",
     "create_file",
@@ -35,4 +154,4 @@ QC_TOOLS = [
     "read_backtest",
     "read_backtest_orders",
     "read_backtest_insights",
-]
\ No newline at end of file
+)
@@ -6,7 +6,8 @@ Orchestrates strategy development from verbal description, strategy implementati
     Spec Agent → Code Agent → Exec Agent → (Revision Loop)
 
 Usage:
-    python main.py
+    python main.py                      # one strategy (STRATEGY_TASK or the default)
+    python main.py task1.txt task2.txt  # one strategy per description file, run concurrently
 
 Environment Variables:
     QUANTCONNECT_USER_ID    - QuantConnect API user ID
@@ -14,15 +15,32 @@ Environment Variables:
     QC_PROJECT_NAME         - Project name (default: SPX_0DTE_Strategy)
     OPENAI_MODEL            - Model to use (default: gpt-5.2)
     STRATEGY_TASK           - Custom strategy description (optional)
+    SEEN_ERRORS_PATH        - Seen compile-error cache (default: qc_mcp/.seen_errors.json)
+    COMPILE_CACHE_PATH      - Compile results by source hash (default: qc_mcp/.compile_cache.json)
+    LOG_LEVEL               - Log level for tool/poll traces (default: INFO)
+    SPEC_TIMEOUT            - Spec Agent run budget in seconds (default: 120)
+    CODE_TIMEOUT            - Code Agent run budget in seconds (default: 180)
+    EXEC_TIMEOUT            - Exec Agent run budget in seconds, incl. polling (default: 800)
+    BACKTEST_POLL_TIMEOUT   - Max seconds to poll one backtest (default: 600)
+    MAX_PARALLEL_STRATEGIES - Strategies run at once from the command line (default: 3)
+    REUSE_MCP_CONTAINER     - Keep one named MCP container and `docker exec` into it (default: off)
+    MCP_CONTAINER_NAME      - Name of the reusable container (default: qc-mcp-server)
+    MCP_EXEC_COMMAND        - Server command run by `docker exec` (default: the image entrypoint)
 """
 
 import asyncio
+import functools
+import hashlib
 import json
-import os
+import logging
 import ast
 import re
+import sys
 from dataclasses import dataclass, field
-from dotenv import load_dotenv
+from pathlib import Path
+from typing import Callable
+from logging.handlers import QueueHandler, QueueListener
+from queue import SimpleQueue
 
 from agents import Agent, Runner
 
@@ -37,10 +55,23 @@ from config import (
     MAX_AGENT_TURNS,
     MAX_COMPILE_ATTEMPTS,
     MAX_REVISION_ATTEMPTS,
-    DEFAULT_PROJECT_NAME,
+    MAX_PARALLEL_STRATEGIES,
     DEFAULT_MAIN_FILE,
     AGENT_TIMEOUT,
+    SPEC_TIMEOUT,
+    CODE_TIMEOUT,
+    EXEC_TIMEOUT,
+    BACKTEST_POLL_TIMEOUT,
+    POLL_INITIAL_DELAY,
+    POLL_MAX_DELAY,
+    POLL_BACKOFF,
     QC_TOOLS,
+    SEEN_ERRORS_PATH,
+    COMPILE_CACHE_PATH,
+    COMPILE_CACHE_TTL,
+    LOG_LEVEL,
+    MAX_ARGUMENTS_JSON_CHARS,
+    settings,
 )
 from strategy_agents import (
     SPEC_AGENT_INSTRUCTIONS,
@@ -48,7 +79,12 @@ from strategy_agents import (
     EXEC_AGENT_INSTRUCTIONS,
 )
 from utils import (
+    CompileCache,
     QCMCPConnection,
+    close_shared_connection,
+    jsonio,
+    project_source_hash,
+    source_hash,
     extract_python_code,
     build_code_prompt,
     build_compile_retry_prompt,
@@ -56,7 +92,10 @@ from utils import (
     build_exec_prompt,
 )
 
-load_dotenv()
+logger = logging.getLogger(__name__)
+
+# Console section separator
+SEP = "=" * 80
 
 # Default strategy task
 DEFAULT_TASK = """Design a 0DTE SPX options strategy optimized for risk-adjusted returns.
@@ -88,7 +127,7 @@ Justify your choices based on 0DTE characteristics: rapid theta decay, intraday
 # Result Class
 # =============================================================================
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ExecResult:
     # Structured result from execution agent.
     project_name: str = ""
@@ -115,19 +154,6 @@ class ExecResult:
             "notes": self.notes,
         }
 
-    def reset(self):
-        # Reset for repeat execution attempts.
-        self.project_name = ""
-        self.project_id = ""
-        self.compile_ok = False
-        self.compile_id = ""
-        self.compile_errors = []
-        self.backtest_ok = False
-        self.backtest_id = ""
-        self.trades = 0
-        self.notes = ""
-        self.submitted = False
-
 
 # =============================================================================
 # Agent Tools Setup
@@ -150,15 +176,22 @@ def tool_cards(mcp: QCMCPConnection, valid_tools: list[str]) -> list[dict]:
     ]
 
 
-def make_agent_tools(mcp: QCMCPConnection, tools: list[str], result_holder: ExecResult):
-    # Create agent tools with shared result holder.
+def make_agent_tools(
+    mcp: QCMCPConnection,
+    tools: list[str],
+    on_result: Callable[[ExecResult], None],
+    background_tasks: set[asyncio.Task] | None = None,
+):
+    # Create agent tools; submit_exec_result hands a fresh ExecResult to on_result.
+    # Background tasks (the backtest poller) are added to background_tasks so
+    # the caller can cancel them when its run ends.
     def _safe_parse(raw_text: str) -> dict:
         if not raw_text:
             return {}
         try:
-            parsed = json.loads(raw_text)
+            parsed = jsonio.loads(raw_text)
             return parsed if isinstance(parsed, dict) else {}
-        except json.JSONDecodeError:
+        except jsonio.JSONDecodeError:
             pass
         try:
             parsed = ast.literal_eval(raw_text)
@@ -166,6 +199,15 @@ def make_agent_tools(mcp: QCMCPConnection, tools: list[str], result_holder: Exec
         except Exception:
             return {}
     
+    def _ok_envelope(tool_name: str, raw_text: str) -> str:
+        # Splice a JSON object response into the envelope as-is, without parsing
+        # it: the body is not inspected here. A `{"` / `{}` start and `}` end is
+        # taken as a JSON object (a Python-repr dict starts with `{'`); anything
+        # else goes through _safe_parse as before.
+        if raw_text and re.match(r'\s*\{\s*["}]', raw_text) and raw_text.rstrip().endswith("}"):
+            return f'{{"ok": true, "tool": {jsonio.dumps(tool_name)}, "data": {raw_text}}}'
+        return jsonio.dumps({"ok": True, "tool": tool_name, "data": _safe_parse(raw_text)})
+
     def _extract_backtest_id(data: dict) -> str | None:
         # Support multiple possible response shapes
         return (
@@ -212,105 +254,473 @@ def make_agent_tools(mcp: QCMCPConnection, tools: list[str], result_holder: Exec
                     return True
 
         return False
-                
+
+    # Full backtest payloads stay here; the agent gets a compact summary and
+    # pulls individual fields with qc_fetch_detail only when it needs them.
+    backtest_details: dict[str, dict] = {}
+
+    def _backtest_body(data: dict) -> dict:
+        bt = data.get("backtest")
+        return bt if isinstance(bt, dict) else data
+
+    def _find_stat(stats: dict, *names: str):
+        for name in names:
+            if name in stats:
+                return stats[name]
+        return None
+
+    def _as_dict(value) -> dict:
+        return value if isinstance(value, dict) else {}
+
+    def _trade_count(*candidates):
+        # First value actually present (0 is a real count); numeric strings
+        # from the statistics table ("12") become ints
+        for value in candidates:
+            if value is None:
+                continue
+            try:
+                return int(str(value).replace(",", ""))
+            except ValueError:
+                return value
+        return None
+
+    def _summarize_backtest(data: dict) -> dict:
+        body = _backtest_body(data)
+        stats = _as_dict(body.get("statistics"))
+        trade_stats = _as_dict(_as_dict(body.get("totalPerformance")).get("tradeStatistics"))
+        total_trades = _trade_count(
+            body.get("totalTrades"),
+            trade_stats.get("totalNumberOfTrades"),
+            _find_stat(stats, "Total Trades", "Total Orders"),
+        )
+        return {
+            "status": _extract_backtest_status(data),
+            "totalTrades": total_trades,
+            "sharpe": _find_stat(stats, "Sharpe Ratio"),
+            "drawdown": _find_stat(stats, "Drawdown"),
+            "error": body.get("error") or data.get("error"),
+        }
+
+    def _backtest_envelope(ok: bool, tool_name: str, backtest_id: str, data: dict, error=None) -> str:
+        backtest_details.setdefault(backtest_id, {})["backtest"] = data
+        envelope = {
+            "ok": ok,
+            "tool": tool_name,
+            "backtestId": backtest_id,
+            "data": _summarize_backtest(data),
+            "detailFields": sorted(_backtest_body(data)),
+        }
+        if error is not None:
+            envelope["error"] = error
+        return jsonio.dumps(envelope)
+
+    def _backtest_list_envelope(tool_name: str, backtest_id: str, raw_text: str) -> str:
+        # read_backtest_orders / read_backtest_insights: keep the list, return its size
+        field = "orders" if tool_name == "read_backtest_orders" else "insights"
+        try:
+            parsed = jsonio.loads(raw_text) if raw_text else None
+        except jsonio.JSONDecodeError:
+            parsed = _safe_parse(raw_text)
+        items = parsed.get(field, parsed) if isinstance(parsed, dict) else parsed
+        backtest_details.setdefault(backtest_id, {})[field] = items
+        count = len(items) if isinstance(items, (list, dict)) else None
+        return jsonio.dumps({
+            "ok": True,
+            "tool": tool_name,
+            "backtestId": backtest_id,
+            "data": {"count": count},
+            "detailFields": [field],
+        })
+
+    # Background backtest polling: create_backtest registers the backtest and
+    # returns at once; one task polls every in-flight backtest per tick and
+    # read_backtest awaits the matching future. Futures settled with an error
+    # are dropped, so a later read or wait starts polling again.
+    pending_backtests: asyncio.Queue = asyncio.Queue()
+    backtest_futures: dict[str, asyncio.Future] = {}
+    poll_task: asyncio.Task | None = None
+
+    async def _poll_backtest_once(project_id, backtest_id: str) -> str | None:
+        # Returns the final tool response once the backtest is terminal, else None.
+        poll_result = await mcp.call_tool_json("read_backtest", {
+            "model": {
+                "projectId": project_id,
+                "backtestId": backtest_id
+            }
+        })
+        if isinstance(poll_result, str) and poll_result.startswith("Error executing tool read_backtest"):
+            logger.warning("Poll %s error: %s", backtest_id, poll_result)
+            return jsonio.dumps({"ok": False, "tool": "read_backtest", "error": poll_result})
+        # call_tool_json already decoded JSON responses; only text needs parsing
+        if isinstance(poll_result, dict):
+            poll_data = poll_result
+        else:
+            poll_data = _safe_parse(poll_result) if isinstance(poll_result, str) else {}
+
+        status = _extract_backtest_status(poll_data) or ""
+        status_lower = status.lower()
+        logger.debug("Poll %s status: %s", backtest_id, status)
+
+        if isinstance(poll_data, dict) and poll_data.get("error"):
+            return _backtest_envelope(False, "read_backtest", backtest_id, poll_data, error=poll_data.get("error"))
+
+        if not status and logger.isEnabledFor(logging.DEBUG):
+            try:
+                preview = str(poll_result)[:500] if poll_result else ""
+            except Exception:
+                preview = ""
+            logger.debug("Poll %s raw preview: %s", backtest_id, preview)
+            if isinstance(poll_data, dict) and poll_data:
+                logger.debug("Poll %s keys: %s", backtest_id, list(poll_data.keys()))
+
+        if any(k in status_lower for k in ("complete", "completed", "finished", "success")):
+            return _backtest_envelope(True, "read_backtest", backtest_id, poll_data)
+        if any(k in status_lower for k in ("error", "failed", "cancel")):
+            return _backtest_envelope(False, "read_backtest", backtest_id, poll_data, error=status)
+
+        # Some MCP responses omit status but include results; treat as completed.
+        if _looks_like_backtest_complete(poll_data):
+            return _backtest_envelope(True, "read_backtest", backtest_id, poll_data)
+        return None
+
+    async def _poll_backtests():
+        # Drain registrations and poll all in-flight backtests concurrently;
+        # exits once nothing is left in flight.
+        loop = asyncio.get_running_loop()
+        in_flight: dict[str, tuple] = {}
+        delay = POLL_INITIAL_DELAY
+        try:
+            while True:
+                while not pending_backtests.empty():
+                    project_id, backtest_id, future = pending_backtests.get_nowait()
+                    in_flight[backtest_id] = (project_id, future, loop.time() + BACKTEST_POLL_TIMEOUT)
+                    delay = POLL_INITIAL_DELAY
+                if not in_flight:
+                    return
+
+                await asyncio.sleep(delay)
+                delay = min(delay * POLL_BACKOFF, POLL_MAX_DELAY)
+
+                ids = list(in_flight)
+                outcomes = await asyncio.gather(
+                    *(_poll_backtest_once(in_flight[bid][0], bid) for bid in ids),
+                    return_exceptions=True,
+                )
+                for backtest_id, outcome in zip(ids, outcomes):
+                    _, future, deadline = in_flight[backtest_id]
+                    if isinstance(outcome, Exception):
+                        # One failed poll (e.g. a tool timeout) is not final;
+                        # retry on the next tick until the deadline
+                        logger.warning("Poll %s failed: %s", backtest_id, outcome)
+                        outcome = None
+                    if outcome is None:
+                        if loop.time() < deadline:
+                            continue
+                        outcome = jsonio.dumps({"ok": False, "tool": "read_backtest", "error": "Backtest timeout"})
+                    _settle_backtest(backtest_id, future, outcome)
+                    del in_flight[backtest_id]
+        except asyncio.CancelledError:
+            # Run torn down: release anyone still awaiting a result
+            stopped = jsonio.dumps({"ok": False, "tool": "read_backtest", "error": "Backtest polling stopped"})
+            for backtest_id, (_, future, _) in in_flight.items():
+                _settle_backtest(backtest_id, future, stopped)
+            raise
+
+    def _settle_backtest(backtest_id: str, future: asyncio.Future, outcome: str) -> None:
+        # Error outcomes are not final for later calls: drop the future so the
+        # next read_backtest or qc_wait_backtest polls again
+        if not jsonio.loads(outcome).get("ok") and backtest_futures.get(backtest_id) is future:
+            del backtest_futures[backtest_id]
+        if not future.done():
+            future.set_result(outcome)
+
+    def _register_backtest(project_id, backtest_id: str) -> None:
+        nonlocal poll_task
+        future = asyncio.get_running_loop().create_future()
+        backtest_futures[backtest_id] = future
+        pending_backtests.put_nowait((project_id, backtest_id, future))
+        if poll_task is None or poll_task.done():
+            poll_task = asyncio.create_task(_poll_backtests())
+            if background_tasks is not None:
+                background_tasks.add(poll_task)
+                poll_task.add_done_callback(background_tasks.discard)
+
+    # Compile results persist across runs, keyed by project + source hash.
+    # Uploads record each file's hash so create_compile can be answered from
+    # the cache when the project's sources match an earlier compile.
+    compile_cache = CompileCache(COMPILE_CACHE_PATH, COMPILE_CACHE_TTL)
+    project_files: dict[str, dict[str, str]] = {}     # projectId -> {fileName: hash}
+    compile_sources: dict[str, tuple[str, str]] = {}  # compileId -> (projectId, hash)
+    cached_compiles: dict[str, dict] = {}             # compileId -> cached result
+
+    def _model(arguments: dict) -> dict:
+        model = arguments.get("model")
+        return model if isinstance(model, dict) else arguments
+
+    def _remember_compile(compile_id: str, data: dict) -> None:
+        # Store a terminal compile result against the sources it was built from
+        if data.get("state") not in ("BuildSuccess", "BuildError"):
+            return
+        if source := compile_sources.pop(compile_id, None):
+            compile_cache.put(*source, data)
+
+    def _cached_compile(tool_name: str, model: dict) -> str | None:
+        # Envelope for a compile already known for these sources, else None
+        if tool_name == "read_compile":
+            cached = cached_compiles.get(str(model.get("compileId")))
+        elif tool_name == "create_compile" and (files := project_files.get(str(model.get("projectId")))):
+            cached = compile_cache.get(str(model.get("projectId")), project_source_hash(files))
+            if cached:
+                cached_compiles[str(cached.get("compileId"))] = cached
+                logger.info("Compile cache hit for project %s", model.get("projectId"))
+        else:
+            return None
+        if not cached:
+            return None
+        return jsonio.dumps({"ok": True, "tool": tool_name, "cached": True, "data": cached})
+
+    def _file_name(model: dict) -> str:
+        return str(model.get("fileName") or model.get("name") or DEFAULT_MAIN_FILE)
+
+    def _unchanged_upload(tool_name: str, model: dict) -> str | None:
+        # Skip re-uploading a file whose content matches the last successful upload
+        content = model.get("content")
+        if tool_name != "update_file_contents" or not isinstance(content, str):
+            return None
+        uploaded = project_files.get(str(model.get("projectId")), {}).get(_file_name(model))
+        if uploaded != source_hash(content):
+            return None
+        logger.info("Skipping upload of unchanged %s", _file_name(model))
+        return jsonio.dumps({
+            "ok": True,
+            "tool": tool_name,
+            "skipped": True,
+            "data": {"success": True, "reason": "File content unchanged since last upload"},
+        })
+
+    def _track_sources(tool_name: str, model: dict, raw: str) -> None:
+        # Bookkeeping for uploads and compiles after the MCP call returns
+        project_id = str(model.get("projectId"))
+        if raw.startswith("Error executing tool"):
+            return
+        if tool_name in ("create_file", "update_file_contents"):
+            content = model.get("content")
+            if isinstance(content, str) and _safe_parse(raw).get("success", True) is not False:
+                project_files.setdefault(project_id, {})[_file_name(model)] = source_hash(content)
+        elif tool_name == "create_compile":
+            data = _safe_parse(raw)
+            if (compile_id := data.get("compileId")) and (files := project_files.get(project_id)):
+                compile_sources[str(compile_id)] = (project_id, project_source_hash(files))
+                _remember_compile(str(compile_id), data)
+        elif tool_name == "read_compile":
+            _remember_compile(str(model.get("compileId")), _safe_parse(raw))
+
+    # O(1) allowlist membership for every qc_call_tool invocation
+    tools_set = frozenset(tools)
+
+    # Tool schemas are fixed for the life of the connection; serialize once
+    tool_cards_json = jsonio.dumps({"available_tools": tool_cards(mcp, tools)})
+
     @function_tool
     async def qc_get_tools() -> str:
         # ist available QuantConnect MCP tools and their JSON input schemas.
-        return json.dumps({"available_tools": tool_cards(mcp, tools)})
+        return tool_cards_json
 
-    @function_tool
-    async def qc_call_tool(tool_name: str, arguments_json: str) -> str:
-        # Execute a QuantConnect MCP tool. Use qc_get_tools() first to get schemas.
-        if tool_name not in tools:
-            return json.dumps({
+    def _not_listed(tool_name: str) -> str | None:
+        # Allowlist check shared by every tool that reaches the MCP session
+        if tool_name in tools_set:
+            return None
+        return jsonio.dumps({
+            "ok": False,
+            "tool": tool_name,
+            "error": f"Tool '{tool_name}' not in list",
+            "available_tools": tools
+        })
+
+    async def _run_tool(tool_name: str, arguments: dict) -> str:
+        # Allowlist check and dispatch shared by qc_call_tool and qc_call_tools_batch.
+        if rejected := _not_listed(tool_name):
+            return rejected
+
+        try:
+            backtest_id = arguments.get("backtestId") or arguments.get("model", {}).get("backtestId")
+
+            # Backtests started through create_backtest are already being polled
+            if tool_name == "read_backtest" and (future := backtest_futures.get(backtest_id)):
+                return await asyncio.shield(future)
+
+            model = _model(arguments)
+            # Answered locally: known compile for these sources, or a no-op upload
+            if short_circuit := _cached_compile(tool_name, model) or _unchanged_upload(tool_name, model):
+                return short_circuit
+
+            raw = await mcp.call_tool(tool_name, arguments)
+            _track_sources(tool_name, model, raw)
+
+            if tool_name in ("read_backtest", "read_backtest_orders", "read_backtest_insights") and backtest_id:
+                if tool_name == "read_backtest":
+                    return _backtest_envelope(True, tool_name, backtest_id, _safe_parse(raw))
+                return _backtest_list_envelope(tool_name, backtest_id, raw)
+
+            # Only create_backtest needs to inspect the response body
+            if tool_name != "create_backtest":
+                return _ok_envelope(tool_name, raw)
+
+            # Hand the new backtest to the background poller
+            data = _safe_parse(raw)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("create_backtest response: %s", data)
+                if not data:
+                    logger.debug("create_backtest raw: %s", raw)
+
+            backtest_id = _extract_backtest_id(data) or _extract_backtest_id_from_raw(raw)
+            project_id = arguments.get("projectId") or arguments.get("model", {}).get("projectId")
+            
+            logger.debug("backtest_id: %s, project_id: %s", backtest_id, project_id)
+
+            if not backtest_id:
+                logger.warning("No backtest_id found, returning early")
+                return jsonio.dumps({"ok": False, "tool": tool_name, "error": "No backtestId", "data": data, "raw": raw})
+
+            if not project_id:
+                logger.warning("No project_id found for backtest polling")
+                return jsonio.dumps({"ok": False, "tool": tool_name, "error": "No projectId", "data": data})
+            
+            _register_backtest(project_id, backtest_id)
+            logger.info("Backtest %s registered for background polling", backtest_id)
+            return jsonio.dumps({
+                "ok": True,
+                "tool": tool_name,
+                "data": {"status": "pending", "backtestId": backtest_id, "projectId": project_id},
+            })
+        except Exception as e:
+            logger.warning("Exception in qc_call_tool: %s", e)
+            return jsonio.dumps({"ok": False, "tool": tool_name, "error": str(e)})
+
+    def _parse_arguments(tool_name: str, arguments_json: str) -> dict | str:
+        # Returns the decoded arguments, or an error envelope string. Cheap
+        # screens run before paying for a full parse of agent output.
+        if len(arguments_json) > MAX_ARGUMENTS_JSON_CHARS:
+            return jsonio.dumps({
                 "ok": False,
                 "tool": tool_name,
-                "error": f"Tool '{tool_name}' not in list",
-                "available_tools": tools
+                "error": f"Invalid arguments_json: exceeds {MAX_ARGUMENTS_JSON_CHARS} characters"
             })
-        
+        if arguments_json and arguments_json.lstrip()[:1] != "{":
+            return jsonio.dumps({
+                "ok": False,
+                "tool": tool_name,
+                "error": "Invalid arguments_json: must be a JSON object"
+            })
+
         try:
-            arguments = json.loads(arguments_json) if arguments_json else {}
+            arguments = jsonio.loads(arguments_json) if arguments_json else {}
             if not isinstance(arguments, dict):
                 raise ValueError("Must decode to dict")
         except Exception as e:
-            return json.dumps({
+            return jsonio.dumps({
                 "ok": False,
                 "tool": tool_name,
                 "error": f"Invalid arguments_json: {e}"
             })
-            
+        return arguments
+
+    @function_tool
+    async def qc_call_tool(tool_name: str, arguments_json: str) -> str:
+        # Execute a QuantConnect MCP tool. Use qc_get_tools() first to get schemas.
+        arguments = _parse_arguments(tool_name, arguments_json)
+        if isinstance(arguments, str):
+            return arguments
+        return await _run_tool(tool_name, arguments)
+
+    @function_tool
+    async def qc_call_tools_batch(calls_json: str) -> str:
+        # Execute independent MCP tools concurrently. calls_json is a JSON array of
+        # {"tool_name": ..., "arguments": {...}}; results come back in the same order.
+        if len(calls_json) > MAX_ARGUMENTS_JSON_CHARS:
+            return jsonio.dumps({"ok": False, "error": f"Invalid calls_json: exceeds {MAX_ARGUMENTS_JSON_CHARS} characters"})
         try:
-            raw = await mcp.call_tool(tool_name, arguments)
-            data = _safe_parse(raw)
-            
-            # Auto-poll for backtest creation
-            if tool_name == "create_backtest":
-                print(f"create_backtest response: {data}")
-                if not data:
-                    print(f"create_backtest raw: {raw}")
+            calls = jsonio.loads(calls_json)
+            if not isinstance(calls, list):
+                raise ValueError("Must decode to a list")
+        except Exception as e:
+            return jsonio.dumps({"ok": False, "error": f"Invalid calls_json: {e}"})
 
-                backtest_id = _extract_backtest_id(data) or _extract_backtest_id_from_raw(raw)
-                project_id = arguments.get("projectId") or arguments.get("model", {}).get("projectId")
-                
-                print(f"backtest_id: {backtest_id}")
-                print(f"project_id: {project_id}")
-                
-                if not backtest_id:
-                    print("No backtest_id found, returning early")
-                    return json.dumps({"ok": False, "tool": tool_name, "error": "No backtestId", "data": data, "raw": raw})
+        async def _one(call) -> str:
+            if not isinstance(call, dict):
+                return jsonio.dumps({"ok": False, "error": "Each call must be an object with tool_name and arguments"})
+            tool_name = str(call.get("tool_name", ""))
+            arguments = call.get("arguments") or {}
+            if isinstance(arguments, str):
+                arguments = _parse_arguments(tool_name, arguments)
+                if isinstance(arguments, str):
+                    return arguments
+            if not isinstance(arguments, dict):
+                return jsonio.dumps({"ok": False, "tool": tool_name, "error": "Invalid arguments: must be an object"})
+            return await _run_tool(tool_name, arguments)
 
-                if not project_id:
-                    print("No project_id found for backtest polling")
-                    return json.dumps({"ok": False, "tool": tool_name, "error": "No projectId", "data": data})
-                
-                print("Starting poll loop...")
-                
-                for i in range(60):
-                    await asyncio.sleep(10)
-                    print(f"Poll {i}...")
-                    poll_result = await mcp.call_tool("read_backtest", {
-                        "model": {
-                            "projectId": project_id,
-                            "backtestId": backtest_id
-                        }
-                    })
-                    if isinstance(poll_result, str) and poll_result.startswith("Error executing tool read_backtest"):
-                        print(f"Poll {i} error: {poll_result}")
-                        return json.dumps({"ok": False, "tool": tool_name, "error": poll_result})
-                    poll_data = _safe_parse(poll_result)
-
-                    status = _extract_backtest_status(poll_data) or ""
-                    status_lower = status.lower()
-                    print(f"Poll {i} status: {status}")
-
-                    if isinstance(poll_data, dict) and poll_data.get("error"):
-                        return json.dumps({"ok": False, "tool": tool_name, "error": poll_data.get("error"), "data": poll_data})
-
-                    if not status:
-                        try:
-                            preview = poll_result[:500] if poll_result else ""
-                        except Exception:
-                            preview = ""
-                        print(f"Poll {i} raw preview: {preview}")
-                        if isinstance(poll_data, dict) and poll_data:
-                            print(f"Poll {i} keys: {list(poll_data.keys())}")
-
-                    if any(k in status_lower for k in ("complete", "completed", "finished", "success")):
-                        return json.dumps({"ok": True, "tool": tool_name, "data": poll_data})
-                    if any(k in status_lower for k in ("error", "failed", "cancel")):
-                        return json.dumps({"ok": False, "tool": tool_name, "error": status, "data": poll_data})
-
-                    # Some MCP responses omit status but include results; treat as completed.
-                    if _looks_like_backtest_complete(poll_data):
-                        return json.dumps({"ok": True, "tool": tool_name, "data": poll_data})
-                
-                return json.dumps({"ok": False, "tool": tool_name, "error": "Backtest timeout"})
-            
-            return json.dumps({"ok": True, "tool": tool_name, "data": data})
+        # Each entry is already a JSON envelope; splice them into one array
+        results = await asyncio.gather(*(_one(call) for call in calls))
+        return "[" + ",".join(results) + "]"
+
+    @function_tool
+    async def qc_wait_compile(project_id: int, compile_id: str, timeout_s: int = 180) -> str:
+        # Poll read_compile with backoff until BuildSuccess/BuildError; one call instead of one turn per poll.
+        if rejected := _not_listed("read_compile"):
+            return rejected
+        arguments = {"model": {"projectId": project_id, "compileId": compile_id}}
+        if cached := _cached_compile("read_compile", arguments["model"]):
+            return cached
+        deadline = asyncio.get_running_loop().time() + timeout_s
+        delay = POLL_INITIAL_DELAY
+        try:
+            while True:
+                raw = await mcp.call_tool("read_compile", arguments)
+                if raw.startswith("Error executing tool"):
+                    return jsonio.dumps({"ok": False, "tool": "read_compile", "error": raw})
+                state = _safe_parse(raw).get("state") or ""
+                if state in ("BuildSuccess", "BuildError"):
+                    _track_sources("read_compile", arguments["model"], raw)
+                    return _ok_envelope("read_compile", raw)
+                remaining = deadline - asyncio.get_running_loop().time()
+                if remaining <= 0:
+                    return jsonio.dumps({"ok": False, "tool": "read_compile", "error": "Compile timeout", "state": state})
+                await asyncio.sleep(min(delay, remaining))
+                delay = min(delay * POLL_BACKOFF, POLL_MAX_DELAY)
         except Exception as e:
-            print(f"Exception in qc_call_tool: {e}")
-            return json.dumps({"ok": False, "tool": tool_name, "error": str(e)})
+            logger.warning("Exception in qc_wait_compile: %s", e)
+            return jsonio.dumps({"ok": False, "tool": "read_compile", "error": str(e)})
+
+    @function_tool
+    async def qc_wait_backtest(project_id: int, backtest_id: str, timeout_s: int = 300) -> str:
+        # Wait for a backtest to finish; shares the background poller with create_backtest.
+        if rejected := _not_listed("read_backtest"):
+            return rejected
+        if backtest_id not in backtest_futures:
+            _register_backtest(project_id, backtest_id)
+        try:
+            return await asyncio.wait_for(asyncio.shield(backtest_futures[backtest_id]), timeout_s)
+        except asyncio.TimeoutError:
+            return jsonio.dumps({
+                "ok": False,
+                "tool": "read_backtest",
+                "backtestId": backtest_id,
+                "error": f"Backtest still running after {timeout_s}s",
+            })
+
+    @function_tool
+    async def qc_fetch_detail(backtest_id: str, field: str) -> str:
+        # Fetch one full field (e.g. "statistics", "orders", "charts") of a backtest already read.
+        details = backtest_details.get(backtest_id)
+        if details is None:
+            return jsonio.dumps({"ok": False, "error": f"No stored details for backtest '{backtest_id}'"})
+        if field in details and field != "backtest":
+            return jsonio.dumps({"ok": True, "backtestId": backtest_id, "field": field, "data": details[field]})
+        body = _backtest_body(details.get("backtest") or {})
+        if field in body:
+            return jsonio.dumps({"ok": True, "backtestId": backtest_id, "field": field, "data": body[field]})
+        available = sorted(set(body) | (set(details) - {"backtest"}))
+        return jsonio.dumps({"ok": False, "error": f"Unknown field '{field}'", "available_fields": available})
 
     @function_tool
     async def submit_exec_result(
@@ -325,29 +735,105 @@ def make_agent_tools(mcp: QCMCPConnection, tools: list[str], result_holder: Exec
         notes: str
     ) -> str:
         #Submit final execution result. Call exactly once when finished.
-        result_holder.project_name = project_name
-        result_holder.project_id = project_id
-        result_holder.compile_ok = compile_ok
-        result_holder.compile_id = compile_id
-        result_holder.compile_errors = compile_errors or []
-        result_holder.backtest_ok = backtest_ok
-        result_holder.backtest_id = backtest_id
-        result_holder.trades = trades
-        result_holder.notes = notes
-        result_holder.submitted = True
+        result = ExecResult(
+            project_name=project_name,
+            project_id=project_id,
+            compile_ok=compile_ok,
+            compile_id=compile_id,
+            compile_errors=compile_errors or [],
+            backtest_ok=backtest_ok,
+            backtest_id=backtest_id,
+            trades=trades,
+            notes=notes,
+            submitted=True,
+        )
+        on_result(result)
         
-        return json.dumps({
+        return jsonio.dumps({
             "status": "Result recorded",
-            "summary": result_holder.to_dict()
+            "summary": result.to_dict()
         })
     
-    return [qc_get_tools, qc_call_tool, submit_exec_result]
+    return [
+        qc_get_tools,
+        qc_call_tool,
+        qc_call_tools_batch,
+        qc_wait_compile,
+        qc_wait_backtest,
+        qc_fetch_detail,
+        submit_exec_result,
+    ]
+
+
+# =============================================================================
+# Compile Error Dedup
+# =============================================================================
+
+def compile_error_hash(errors: list[str]) -> str:
+    # Stable across runs (unlike hash()), so it can be persisted. Messages are
+    # stripped and de-duplicated so ordering/whitespace noise is not a new error.
+    normalized = sorted({e.strip().encode() for e in errors})
+    return hashlib.blake2b(b"\n".join(normalized), digest_size=16).hexdigest()
+
+
+def load_seen_error_hashes(project_name: str) -> set[str]:
+    try:
+        cache = jsonio.loads(SEEN_ERRORS_PATH.read_bytes())
+    except (OSError, ValueError):
+        return set()
+    return set(cache.get(project_name, [])) if isinstance(cache, dict) else set()
+
+
+def save_seen_error_hashes(project_name: str, hashes: set[str]) -> None:
+    try:
+        cache = jsonio.loads(SEEN_ERRORS_PATH.read_bytes())
+        if not isinstance(cache, dict):
+            cache = {}
+    except (OSError, ValueError):
+        cache = {}
+    if hashes:
+        cache[project_name] = sorted(hashes)
+    else:
+        cache.pop(project_name, None)
+    try:
+        SEEN_ERRORS_PATH.write_text(jsonio.dumps(cache))
+    except OSError as e:
+        logger.warning("Could not persist seen compile errors: %s", e)
+
+
+# =============================================================================
+# Logging
+# =============================================================================
+
+def configure_logging(level: str = "INFO") -> QueueListener:
+    # Log records are queued and written from a listener thread, so stderr
+    # I/O never blocks the event loop. Caller must stop() the listener.
+    log_queue = SimpleQueue()
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+    listener = QueueListener(log_queue, handler)
+
+    root = logging.getLogger()
+    root.addHandler(QueueHandler(log_queue))
+    root.setLevel(level)
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    listener.start()
+    return listener
 
 
 # =============================================================================
 # Agent Runner
 # =============================================================================
 
+@functools.lru_cache(maxsize=None)
+def make_agent(name: str, instructions: str, model: str) -> Agent:
+    # Tool-less agents depend only on their configuration, so repeat pipeline
+    # runs in one process reuse them. The Exec Agent is built per run because
+    # its tools close over that run's connection and result callback.
+    return Agent(name=name, instructions=instructions, model=model, tools=[])
+
+
 async def run_agent(agent: Agent, input_text: str, max_turns: int, timeout: int = AGENT_TIMEOUT):
     #Run agent with a set timeout
     try:
@@ -363,203 +849,256 @@ async def run_agent(agent: Agent, input_text: str, max_turns: int, timeout: int
 # Main Orchestration
 # =============================================================================
 
-async def main():
+async def main(task: str | None = None, project_name: str | None = None):
     # Main pipeline: Spec → Code → Exec with revision loop
     
     # Configuration
-    task = os.getenv("STRATEGY_TASK", DEFAULT_TASK)
-    project_name = os.getenv("QC_PROJECT_NAME", DEFAULT_PROJECT_NAME)
+    task = task or settings.strategy_task or DEFAULT_TASK
+    project_name = project_name or settings.qc_project_name
     
-    print("=" * 80)
+    print(SEP)
     print("STRATEGY PIPELINE")
-    print("=" * 80)
+    print(SEP)
     print(f"Task: {task[:100]}...")
     print(f"Project: {project_name}")
     print(f"Model: {OPENAI_MODEL}")
     print()
     
-    async with QCMCPConnection() as mcp:
-        print(f"✓ MCP connected ({len(mcp.tools)} tools)")
+    # The Spec Agent needs no MCP tools, so run it while the container starts
+    spec_agent = make_agent("Spec_Agent", SPEC_AGENT_INSTRUCTIONS, OPENAI_MODEL)
+    spec_task = asyncio.create_task(run_agent(spec_agent, task, max_turns=20, timeout=SPEC_TIMEOUT))
+
+    # Any failure before the spec is collected (connect, tool setup) must not
+    # leave the Spec Agent running with its result never awaited; the backtest
+    # poller is cancelled when the run ends either way
+    background_tasks: set[asyncio.Task] = set()
+    try:
+        async with QCMCPConnection(shared=True) as mcp:
+            print(f"✓ MCP connected ({len(mcp.get_tools_cached())} tools)")
         
-        filtered_tools = build_tool_bank(mcp)
-        print(f"✓ Tools: {', '.join(filtered_tools)}")
+            filtered_tools = build_tool_bank(mcp)
+            print(f"✓ Tools: {', '.join(filtered_tools)}")
         
-        # Shared result holder
-        exec_result = ExecResult()
-        agent_tools = make_agent_tools(mcp, filtered_tools, exec_result)
+            # Latest submitted result; replaced (not mutated) on every attempt
+            exec_result = ExecResult()
+
+            def record_exec_result(result: ExecResult):
+                nonlocal exec_result
+                exec_result = result
+
+            agent_tools = make_agent_tools(mcp, filtered_tools, record_exec_result, background_tasks)
         
-        # Initialize agents
-        spec_agent = Agent(
-            name="Spec_Agent",
-            instructions=SPEC_AGENT_INSTRUCTIONS,
-            model=OPENAI_MODEL,
-            tools=[]
-        )
-        code_agent = Agent(
-            name="Code_Agent",
-            instructions=CODER_AGENT_INSTRUCTIONS,
-            model=OPENAI_MODEL,
-            tools=[]
-        )
-        exec_agent = Agent(
-            name="Exec_Agent",
-            instructions=EXEC_AGENT_INSTRUCTIONS,
-            model=OPENAI_MODEL,
-            tools=agent_tools
-        )
+            # Initialize agents
+            code_agent = make_agent("Code_Agent", CODER_AGENT_INSTRUCTIONS, OPENAI_MODEL)
+            exec_agent = Agent(
+                name="Exec_Agent",
+                instructions=EXEC_AGENT_INSTRUCTIONS,
+                model=OPENAI_MODEL,
+                tools=agent_tools
+            )
 
-        # =====================================================================
-        # PHASE 1: SPEC WRITING
-        # =====================================================================
-        print(f"\n{'='*80}\nPHASE 1: SPECIFICATION\n{'='*80}")
+            # =================================================================
+            # PHASE 1: SPEC WRITING
+            # =================================================================
+            print(f"\n{SEP}\nPHASE 1: SPECIFICATION\n{SEP}")
         
-        try:
-            spec_result = await run_agent(spec_agent, task, max_turns=20)
-            spec_text = spec_result.final_output
-        except Exception as e:
-            print(f"✗ Spec Agent failed: {e}")
-            return None
+            try:
+                spec_result = await spec_task
+                spec_text = spec_result.final_output
+            except Exception as e:
+                print(f"✗ Spec Agent failed: {e}")
+                return None
         
-        print(f"✓ Specification generated ({len(spec_text)} chars)")
-        print(f"\n{spec_text}\n")
+            print(f"✓ Specification generated ({len(spec_text)} chars)")
+            print(f"\n{spec_text}\n")
 
-        # =====================================================================
-        # PHASE 2: CODE GENERATION
-        # =====================================================================
-        print(f"\n{'='*80}\nPHASE 2: CODE GENERATION\n{'='*80}")
+            # =================================================================
+            # PHASE 2: CODE GENERATION
+            # =================================================================
+            print(f"\n{SEP}\nPHASE 2: CODE GENERATION\n{SEP}")
         
-        code_prompt = build_code_prompt(spec_text)
+            code_prompt = build_code_prompt(spec_text)
         
-        try:
-            code_result = await run_agent(code_agent, code_prompt, max_turns=20)
-        except Exception as e:
-            print(f"✗ Code Agent failed: {e}")
-            return None
+            try:
+                code_result = await run_agent(code_agent, code_prompt, max_turns=20, timeout=CODE_TIMEOUT)
+            except Exception as e:
+                print(f"✗ Code Agent failed: {e}")
+                return None
         
-        current_code = extract_python_code(code_result.final_output)
-        if not current_code:
-            print("✗ Code Agent did not produce valid Python code")
-            return None
+            current_code = extract_python_code(code_result.final_output)
+            if not current_code:
+                print("✗ Code Agent did not produce valid Python code")
+                return None
         
-        print(f"✓ Code generated ({len(current_code)} chars)")
-        print(f"GENERATED CODE: \n{current_code}")
+            print(f"✓ Code generated ({len(current_code)} chars)")
+            print(f"GENERATED CODE: \n{current_code}")
 
-        # =====================================================================
-        # PHASE 3: EXECUTION & REVISION
-        # =====================================================================
-        print(f"\n{'='*80}\nPHASE 3: EXECUTION\n{'='*80}")
+            # =================================================================
+            # PHASE 3: EXECUTION & REVISION
+            # =================================================================
+            print(f"\n{SEP}\nPHASE 3: EXECUTION\n{SEP}")
         
-        revision_count = 0
-        seen_error_hashes: set[str] = set()
-        final_result = None
+            revision_count = 0
+            # A repeat within this run stops the loop. Errors from earlier
+            # runs are advisory only: they still get one fix attempt here.
+            seen_error_hashes: set[str] = set()
+            known_error_hashes = load_seen_error_hashes(project_name)
+            final_result = None
 
-        project_id = None
+            project_id = None
 
-        for attempt in range(1, MAX_COMPILE_ATTEMPTS + 1):
-            print(f"\n--- Attempt {attempt}/{MAX_COMPILE_ATTEMPTS} "
-                  f"(Revisions: {revision_count}/{MAX_REVISION_ATTEMPTS}) ---")
+            for attempt in range(1, MAX_COMPILE_ATTEMPTS + 1):
+                print(f"\n--- Attempt {attempt}/{MAX_COMPILE_ATTEMPTS} "
+                      f"(Revisions: {revision_count}/{MAX_REVISION_ATTEMPTS}) ---")
             
-            exec_result.reset()
-            exec_input = build_exec_prompt(
-                project_name, 
-                DEFAULT_MAIN_FILE, 
-                current_code,
-                project_id=project_id 
-            )
+                exec_result = ExecResult()
+                exec_input = build_exec_prompt(
+                    project_name, 
+                    DEFAULT_MAIN_FILE, 
+                    current_code,
+                    project_id=project_id 
+                )
             
-            try:
-                await run_agent(exec_agent, exec_input, max_turns=MAX_AGENT_TURNS)
-            except Exception as e:
-                print(f"✗ Exec Agent error: {e}")
-                continue
+                try:
+                    await run_agent(exec_agent, exec_input, max_turns=MAX_AGENT_TURNS, timeout=EXEC_TIMEOUT)
+                except Exception as e:
+                    print(f"✗ Exec Agent error: {e}")
+                    continue
 
-            if not exec_result.submitted:
-                print("⚠ Exec Agent did not submit results")
-                continue
+                if not exec_result.submitted:
+                    print("⚠ Exec Agent did not submit results")
+                    continue
             
-            if exec_result.project_id:
-                project_id = exec_result.project_id
-
-            # Log status
-            print(f"  Project ID: {exec_result.project_id}")
-            print(f"  Compile: {'✓' if exec_result.compile_ok else '✗'}")
-            print(f"  Backtest: {'✓' if exec_result.backtest_ok else '✗'}")
-            print(f"  Trades: {exec_result.trades}")
-
-            # SUCCESS
-            if exec_result.compile_ok and exec_result.backtest_ok and exec_result.trades > 0:
-                print(f"\n{'='*80}")
-                print(f"✓ SUCCESS: {exec_result.trades} trades executed")
-                print(f"{'='*80}")
-                final_result = exec_result.to_dict()
-                break
-
-            # Check revision budget
-            if revision_count >= MAX_REVISION_ATTEMPTS:
-                print(f"⚠ Max revisions ({MAX_REVISION_ATTEMPTS}) reached")
-                final_result = exec_result.to_dict()
-                break
-
-            # COMPILE FAILURE
-            if not exec_result.compile_ok:
-                errors = exec_result.compile_errors or ["Unknown compile error"]
-                error_hash = hash(tuple(sorted(errors)))
-                
-                if error_hash in seen_error_hashes:
-                    print("⚠ Same errors repeated, stopping")
+                if exec_result.project_id:
+                    project_id = exec_result.project_id
+
+                # Log status
+                print(f"  Project ID: {exec_result.project_id}")
+                print(f"  Compile: {'✓' if exec_result.compile_ok else '✗'}")
+                print(f"  Backtest: {'✓' if exec_result.backtest_ok else '✗'}")
+                print(f"  Trades: {exec_result.trades}")
+
+                # SUCCESS
+                if exec_result.compile_ok and exec_result.backtest_ok and exec_result.trades > 0:
+                    print(f"\n{SEP}")
+                    print(f"✓ SUCCESS: {exec_result.trades} trades executed")
+                    print(SEP)
+                    final_result = exec_result.to_dict()
+                    if known_error_hashes:
+                        save_seen_error_hashes(project_name, set())
+                    break
+
+                # Check revision budget
+                if revision_count >= MAX_REVISION_ATTEMPTS:
+                    print(f"⚠ Max revisions ({MAX_REVISION_ATTEMPTS}) reached")
                     final_result = exec_result.to_dict()
                     break
+
+                # COMPILE FAILURE
+                if not exec_result.compile_ok:
+                    errors = exec_result.compile_errors or ["Unknown compile error"]
+                    error_hash = compile_error_hash(errors)
                 
-                seen_error_hashes.add(error_hash)
-                print(f"  Errors: {errors[:3]}{'...' if len(errors) > 3 else ''}")
+                    if error_hash in seen_error_hashes:
+                        print("⚠ Same errors repeated, stopping")
+                        final_result = exec_result.to_dict()
+                        break
+                    if error_hash in known_error_hashes:
+                        print("  ⚠ Errors also seen in an earlier run; retrying once")
                 
-                # Request fix
-                retry_prompt = build_compile_retry_prompt(current_code, errors)
+                    seen_error_hashes.add(error_hash)
+                    known_error_hashes.add(error_hash)
+                    save_seen_error_hashes(project_name, known_error_hashes)
+                    print(f"  Errors: {errors[:3]}{'...' if len(errors) > 3 else ''}")
                 
-                try:
-                    retry_result = await run_agent(code_agent, retry_prompt, max_turns=15)
-                    new_code = extract_python_code(retry_result.final_output)
+                    # Request fix
+                    retry_prompt = build_compile_retry_prompt(current_code, errors)
+                
+                    try:
+                        retry_result = await run_agent(code_agent, retry_prompt, max_turns=15, timeout=CODE_TIMEOUT)
+                        new_code = extract_python_code(retry_result.final_output)
                     
-                    if new_code and new_code != current_code:
-                        current_code = new_code
-                        revision_count += 1
-                        print(f"  ✓ Code revised (revision #{revision_count})")
-                        continue
-                except Exception as e:
-                    print(f"  ✗ Revision failed: {e}")
+                        if new_code and new_code != current_code:
+                            current_code = new_code
+                            revision_count += 1
+                            print(f"  ✓ Code revised (revision #{revision_count})")
+                            continue
+                    except Exception as e:
+                        print(f"  ✗ Revision failed: {e}")
                 
-                continue
+                    continue
 
-            # ZERO TRADES
-            if exec_result.trades == 0:
-                print("  ⚠ Backtest succeeded but no trades")
+                # ZERO TRADES
+                if exec_result.trades == 0:
+                    print("  ⚠ Backtest succeeded but no trades")
                 
-                revision_prompt = build_zero_trades_prompt(current_code, exec_result.to_dict())
+                    revision_prompt = build_zero_trades_prompt(current_code, exec_result.to_dict())
                 
-                try:
-                    revision_result = await run_agent(code_agent, revision_prompt, max_turns=20)
-                    new_code = extract_python_code(revision_result.final_output)
+                    try:
+                        revision_result = await run_agent(code_agent, revision_prompt, max_turns=20, timeout=CODE_TIMEOUT)
+                        new_code = extract_python_code(revision_result.final_output)
                     
-                    if new_code and new_code != current_code:
-                        current_code = new_code
-                        revision_count += 1
-                        seen_error_hashes.clear()
-                        print(f"  ✓ Logic revised (revision #{revision_count})")
-                        continue
-                except Exception as e:
-                    print(f"  ✗ Revision failed: {e}")
+                        if new_code and new_code != current_code:
+                            current_code = new_code
+                            revision_count += 1
+                            seen_error_hashes.clear()
+                            known_error_hashes.clear()
+                            save_seen_error_hashes(project_name, known_error_hashes)
+                            print(f"  ✓ Logic revised (revision #{revision_count})")
+                            continue
+                    except Exception as e:
+                        print(f"  ✗ Revision failed: {e}")
                 
-                continue
+                    continue
 
-        # Final output
-        if final_result:
-            print(f"\n{'='*80}\nFINAL RESULT\n{'='*80}")
-            print(json.dumps(final_result, indent=2))
-        else:
-            print("\n✗ Pipeline failed to produce results")
+            # Final output
+            if final_result:
+                print(f"\n{SEP}\nFINAL RESULT\n{SEP}")
+                print(json.dumps(final_result, indent=2))
+            else:
+                print("\n✗ Pipeline failed to produce results")
         
-        return final_result
+            return final_result
+    finally:
+        if not spec_task.done():
+            spec_task.cancel()
+        for background_task in list(background_tasks):
+            background_task.cancel()
+
+
+async def run_parallel_strategies(tasks: list[str], max_concurrency: int = MAX_PARALLEL_STRATEGIES) -> list[dict | None]:
+    # Run the full pipeline for several strategies concurrently. The work is
+    # LLM/network bound, so tasks on one loop share the warm MCP session; each
+    # strategy gets its own QC project so compiles and backtests never collide.
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def _one(index: int, task: str) -> dict | None:
+        async with semaphore:
+            try:
+                return await main(task, f"{settings.qc_project_name}_{index}")
+            except Exception as e:
+                logger.warning("Strategy %d failed: %s", index, e)
+                return None
+
+    return await asyncio.gather(*(_one(i, task) for i, task in enumerate(tasks, 1)))
+
+
+async def _run_cli():
+    try:
+        if len(sys.argv) > 1:
+            tasks = [Path(path).read_text(encoding="utf-8") for path in sys.argv[1:]]
+            # main() would silently fall back to the default task for these
+            if empty := [path for path, task in zip(sys.argv[1:], tasks) if not task.strip()]:
+                raise SystemExit(f"Empty task file(s): {', '.join(empty)}")
+            return await run_parallel_strategies(tasks)
+        return await main()
+    finally:
+        await close_shared_connection()
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    log_listener = configure_logging(LOG_LEVEL)
+    try:
+        asyncio.run(_run_cli())
+    finally:
+        log_listener.stop()
\ No newline at end of file
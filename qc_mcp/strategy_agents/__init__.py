@@ -4,14 +4,29 @@
 
 from .instructions import (
     SPEC_AGENT_INSTRUCTIONS,
-    CODER_AGENT_INSTRUCTIONS,
     EXEC_AGENT_INSTRUCTIONS,
 )
-from .templates import QC_REFERENCE_TEMPLATE
+from .templates import (
+    get_api_reference,
+    get_reference_template,
+)
 
 __all__ = [
     "SPEC_AGENT_INSTRUCTIONS",
     "CODER_AGENT_INSTRUCTIONS",
     "EXEC_AGENT_INSTRUCTIONS",
     "QC_REFERENCE_TEMPLATE",
+    "get_api_reference",
+    "get_reference_template",
 ]
+
+
+# Names backed by the template text resolve on first access, so importing the
+# package (e.g. for an Exec-only run) does not read it
+def __getattr__(name: str) -> str:
+    if name == "CODER_AGENT_INSTRUCTIONS":
+        from . import instructions
+        return instructions.CODER_AGENT_INSTRUCTIONS
+    if name == "QC_REFERENCE_TEMPLATE":
+        return get_reference_template()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
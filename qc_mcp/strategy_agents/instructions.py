@@ -1,6 +1,8 @@
 """Agent instructions for the strategy pipeline."""
 
-from .templates import QC_REFERENCE_TEMPLATE
+import functools
+
+from .templates import get_reference_template
 
 # =============================================================================
 # SPEC AGENT
@@ -66,7 +68,9 @@ SPEC_AGENT_INSTRUCTIONS = """You are the SPEC AGENT. Produce a strategy specific
 # CODE AGENT
 # =============================================================================
 
-CODER_AGENT_INSTRUCTIONS = f"""You are the CODE AGENT. Produce complete, compilable QuantConnect Python code.
+# Static fragments around the template slot; the template is read and the
+# instructions joined on first access (see __getattr__ below)
+_CODER_HEAD = """You are the CODE AGENT. Produce complete, compilable QuantConnect Python code.
 
 ## API REFERENCE (use these patterns exactly)
 
@@ -163,7 +167,7 @@ self.Schedule.On(
 
 ### Debugging
 ```python
-self.Debug(f"{{self.Time}}: Message here")
+self.Debug(f"{self.Time}: Message here")
 self.Log(f"Permanent log message")
 ```
 
@@ -213,7 +217,8 @@ Before placing orders, verify:
 ## TEMPLATE (implement marked methods)
 
 ```python
-{QC_REFERENCE_TEMPLATE}
+"""
+_CODER_TAIL = """
 ```
 
 ## OUTPUT FORMAT
@@ -223,6 +228,19 @@ Before placing orders, verify:
 3. Code MUST handle Greeks being None
 4. Code MUST include Debug statements"""
 
+
+@functools.cache
+def _build_coder_instructions() -> str:
+    return "".join((_CODER_HEAD, get_reference_template(), _CODER_TAIL))
+
+
+def __getattr__(name: str) -> str:
+    # CODER_AGENT_INSTRUCTIONS resolves lazily, so Spec/Exec-only imports
+    # never read the template
+    if name == "CODER_AGENT_INSTRUCTIONS":
+        return _build_coder_instructions()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 # =============================================================================
 # EXEC AGENT
 # =============================================================================
@@ -232,6 +250,10 @@ EXEC_AGENT_INSTRUCTIONS = """You are the EXEC AGENT. Deploy code to QuantConnect
 **TOOLS:**
 - `qc_get_tools()`: List available MCP tools and schemas
 - `qc_call_tool(tool_name, arguments_json)`: Execute MCP tool
+- `qc_call_tools_batch(calls_json)`: Execute independent MCP tools concurrently; `calls_json` is a JSON array of `{"tool_name": ..., "arguments": {...}}`, results return in the same order
+- `qc_wait_compile(project_id, compile_id)`: Wait until a compile reaches BuildSuccess or BuildError
+- `qc_wait_backtest(project_id, backtest_id)`: Wait until a backtest completes or fails
+- `qc_fetch_detail(backtest_id, field)`: Full value of one backtest field (only when the summary is not enough)
 - `submit_exec_result(...)`: Submit results (call EXACTLY once at end)
 
 **WORKFLOW:**
@@ -249,22 +271,26 @@ EXEC_AGENT_INSTRUCTIONS = """You are the EXEC AGENT. Deploy code to QuantConnect
 
 4. Compile:
    `qc_call_tool("create_compile", '{"model": {"projectId": ID}}')`
-   - Poll with `read_compile` until state is BuildSuccess or BuildError
-   - Example: `qc_call_tool("read_compile", '{"model": {"projectId": ID, "compileId": "CID"}}')`
+   - If the response has `"cached": true`, it already holds the final state; skip waiting
+   - Otherwise call `qc_wait_compile(ID, "CID")` once; it returns the final `read_compile` response
+   - Do not poll `read_compile` yourself
    - If BuildError, extract errors, submit result, and STOP
 
 5. Backtest:
    `qc_call_tool("create_backtest", '{"model": {"projectId": ID, "compileId": "CID", "backtestName": "Test"}}')`
-   - This returns quickly with a backtestId; you MUST poll `read_backtest`
-   - Poll `read_backtest` until status/state indicates completion or error
-   - Example: `qc_call_tool("read_backtest", '{"model": {"projectId": ID, "backtestId": "BID"}}')`
-   - Extract trade count from the completed backtest response
+   - This returns immediately with status "pending" and a backtestId; polling runs in the background
+   - Then call `qc_wait_backtest(ID, "BID")` once; it waits until completion or error
+   - Do not poll `read_backtest` yourself
+   - `qc_wait_backtest` returns a summary (status, totalTrades, sharpe, drawdown, error); take the trade count from `totalTrades`
+   - If totalTrades is missing, use `qc_fetch_detail(BID, "statistics")`
 
 6. Submit final results:
    Call `submit_exec_result()` with all collected data
 
 **RULES:**
 - JSON arguments must be minified strings with escaped quotes
+- Batch independent calls (e.g. `read_backtest_orders` + `read_backtest_insights`) with `qc_call_tools_batch` to save turns
+- Never batch calls that depend on each other (upload → compile → backtest must stay sequential)
 - Never attempt to fix code - just report errors
 - Always call submit_exec_result() exactly once at the end
 - If any step fails, still submit with available information"""
\ No newline at end of file
@@ -1,31 +1,50 @@
 """Utilities package for the strategy pipeline."""
 
-from .mcp_connection import QCMCPConnection, ToolInfo
+from . import jsonio
+from .compile_cache import CompileCache, project_source_hash, source_hash
+from .mcp_connection import (
+    QCMCPConnection,
+    QCMCPConnectionPool,
+    ToolInfo,
+    close_shared_connection,
+)
 from .parsing import (
     extract_python_code,
     extract_compile_errors,
     #prepare_code_for_json,
-    #truncate_text,
+    truncate_text,
 )
 from .prompts import (
     build_code_prompt,
     build_compile_retry_prompt,
+    build_compile_retry_messages,
     build_zero_trades_prompt,
     build_exec_prompt,
+    build_batch_exec_prompts,
 )
 
 __all__ = [
     # MCP Connection
     "QCMCPConnection",
+    "QCMCPConnectionPool",
     "ToolInfo",
+    "close_shared_connection",
+    # JSON
+    "jsonio",
+    # Compile cache
+    "CompileCache",
+    "source_hash",
+    "project_source_hash",
     # Parsing
     "extract_python_code",
     "extract_compile_errors",
     #"prepare_code_for_json",
-    #"truncate_text",
+    "truncate_text",
     # Prompts
     "build_code_prompt",
     "build_compile_retry_prompt",
+    "build_compile_retry_messages",
     "build_zero_trades_prompt",
     "build_exec_prompt",
+    "build_batch_exec_prompts",
 ]
\ No newline at end of file
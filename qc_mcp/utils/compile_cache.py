@@ -0,0 +1,71 @@
+"""Persistent cache of terminal compile results, keyed by project and source hash."""
+
+import hashlib
+import logging
+import time
+from pathlib import Path
+from typing import Any
+
+from . import jsonio
+
+logger = logging.getLogger(__name__)
+
+
+def source_hash(content: str) -> str:
+    """Stable digest of one file's source (unlike hash(), safe to persist)."""
+    return hashlib.blake2b(content.encode(), digest_size=16).hexdigest()
+
+
+def project_source_hash(files: dict[str, str]) -> str:
+    """Combine per-file digests (fileName -> source_hash) into one project digest."""
+    combined = "\n".join(f"{name}:{files[name]}" for name in sorted(files))
+    return hashlib.blake2b(combined.encode(), digest_size=16).hexdigest()
+
+
+class CompileCache:
+    """
+    JSON-file cache of BuildSuccess/BuildError results.
+
+    Keyed by (projectId, project source hash): QuantConnect compiles are
+    project-scoped, so identical code in another project still compiles on its
+    own. Entries older than ttl seconds are ignored, since QC does not keep
+    compile artifacts forever.
+    """
+
+    def __init__(self, path: Path, ttl: float):
+        self.path = path
+        self.ttl = ttl
+        self._entries = self._load()
+
+    def _load(self) -> dict[str, Any]:
+        try:
+            entries = jsonio.loads(self.path.read_bytes())
+        except (OSError, ValueError):
+            return {}
+        return entries if isinstance(entries, dict) else {}
+
+    @staticmethod
+    def _key(project_id: Any, digest: str) -> str:
+        return f"{project_id}:{digest}"
+
+    def get(self, project_id: Any, digest: str) -> dict | None:
+        """Return the stored compile result, or None if missing or expired."""
+        entry = self._entries.get(self._key(project_id, digest))
+        if not isinstance(entry, dict) or time.time() - entry.get("storedAt", 0) > self.ttl:
+            return None
+        return entry.get("result")
+
+    def put(self, project_id: Any, digest: str, result: dict) -> None:
+        """Store a terminal compile result and persist the cache."""
+        # Re-read first so concurrent pipelines sharing the file don't drop entries
+        entries = self._load()
+        entries[self._key(project_id, digest)] = {"storedAt": time.time(), "result": result}
+        now = time.time()
+        self._entries = {
+            key: entry for key, entry in entries.items()
+            if isinstance(entry, dict) and now - entry.get("storedAt", 0) <= self.ttl
+        }
+        try:
+            self.path.write_text(jsonio.dumps(self._entries))
+        except OSError as e:
+            logger.warning("Could not persist compile cache: %s", e)
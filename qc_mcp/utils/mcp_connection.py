@@ -1,16 +1,24 @@
 """QuantConnect MCP connection handler."""
 
 import asyncio
-import json
-import os
+import contextlib
+import logging
+import shlex
 from dataclasses import dataclass
 from typing import Any
 
 from mcp import ClientSession, StdioServerParameters
 from mcp.client.stdio import stdio_client
+from mcp.types import TextContent
 
+from config import READ_ONLY_TOOLS, TOOL_CACHE_SIZE, TOOL_CACHE_TTL, WRITE_TOOLS, settings
+from . import jsonio
+from .tool_cache import ToolResultCache
 
-@dataclass
+logger = logging.getLogger(__name__)
+
+
+@dataclass(slots=True)
 class ToolInfo:
     """MCP tool metadata."""
     name: str
@@ -18,10 +26,99 @@ class ToolInfo:
     input_schema: dict[str, Any]
 
 
+def _serialize_content(content: list) -> str:
+    """Join MCP response blocks into one string."""
+    # MCP response may contain various types of content
+    # Every block yields exactly one chunk, so the list is sized up front
+    chunks = [""] * len(content)
+    for i, block in enumerate(content):
+        # TextContent is by far the common case; skip the attribute probing
+        if isinstance(block, TextContent):
+            chunks[i] = block.text
+        elif text := getattr(block, "text", None):
+            chunks[i] = text
+        elif (data := getattr(block, "data", None)) is not None:
+            chunks[i] = jsonio.dumps(data) if isinstance(data, (dict, list)) else str(data)
+        elif hasattr(block, "model_dump_json"):
+            chunks[i] = block.model_dump_json()
+        else:
+            chunks[i] = str(block)
+    return "\n".join(chunks)
+
+
+async def _docker(*args: str) -> str:
+    """Run a docker CLI command and return its stripped stdout."""
+    proc = await asyncio.create_subprocess_exec(
+        "docker", *args,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    out, err = await proc.communicate()
+    if proc.returncode != 0:
+        raise RuntimeError(f"docker {args[0]} failed: {err.decode().strip()}")
+    return out.decode().strip()
+
+
+async def _reusable_container_args(user_id: str, api_token: str) -> list[str]:
+    """Ensure the named MCP container is running and return `docker exec` args.
+
+    The container is started once with its entrypoint replaced by
+    `sleep infinity`; each connection then execs the image's original
+    entrypoint (or MCP_EXEC_COMMAND) over stdio.
+    """
+    name = settings.mcp_container_name
+    image = "quantconnect/mcp-server"
+
+    if not await _docker("ps", "-q", "-f", f"name=^{name}$"):
+        # Clear out a stopped container of the same name before recreating it
+        if await _docker("ps", "-aq", "-f", f"name=^{name}$"):
+            await _docker("rm", "-f", name)
+        args = ["run", "-d", "-i", "--name", name, "--entrypoint", "sleep"]
+        if platform := settings.docker_platform:
+            args += ["--platform", platform]
+        args += [
+            "-e", f"QUANTCONNECT_USER_ID={user_id}",
+            "-e", f"QUANTCONNECT_API_TOKEN={api_token}",
+            image, "infinity",
+        ]
+        await _docker(*args)
+        logger.info("Started reusable MCP container %s", name)
+
+    if settings.mcp_exec_command:
+        command = shlex.split(settings.mcp_exec_command)
+    else:
+        config = jsonio.loads(await _docker(
+            "image", "inspect", "-f", "{{json .Config}}", image
+        ))
+        command = (config.get("Entrypoint") or []) + (config.get("Cmd") or [])
+        if not command:
+            raise RuntimeError(f"{image} has no entrypoint; set MCP_EXEC_COMMAND")
+    return ["exec", "-i", name, *command]
+
+
+async def _serialize_content_async(content: list) -> str:
+    """_serialize_content, off the event loop when blocks need JSON encoding."""
+    # Pure text responses only need a join; dumping data blocks can take long
+    # enough on large backtest payloads to stall concurrent tool calls
+    if all(isinstance(block, TextContent) for block in content):
+        return _serialize_content(content)
+    return await asyncio.to_thread(_serialize_content, content)
+
+
 class QCMCPConnection:
-    """Manages connection to QuantConnect MCP server via Docker."""
+    """Manages connection to QuantConnect MCP server via Docker.
+
+    Use as an async context manager, or call connect()/disconnect() to keep
+    one Docker subprocess open across many agent runs. Both calls must come
+    from the same asyncio task (stdio_client runs an anyio task group).
+
+    With shared=True the connection borrows a process-wide session that stays
+    open after disconnect(), so later pipeline runs skip the Docker cold start.
+    Call close_shared_connection() before the event loop shuts down.
+    """
     
-    def __init__(self, init_timeout: float = 30.0, tool_timeout: float = 120.0):
+    def __init__(self, init_timeout: float = 30.0, tool_timeout: float = 120.0, shared: bool = False):
+        self.shared = shared
         self.session: ClientSession | None = None
         self._stdio_context = None
         self._session_context = None
@@ -29,60 +126,90 @@ class QCMCPConnection:
         self.tools_by_name: dict[str, ToolInfo] = {}
         self.init_timeout = init_timeout
         self.tool_timeout = tool_timeout
+        self.cache = ToolResultCache(TOOL_CACHE_SIZE, TOOL_CACHE_TTL)
 
     async def __aenter__(self):
-        user_id = os.getenv("QUANTCONNECT_USER_ID")
-        api_token = os.getenv("QUANTCONNECT_API_TOKEN")
-        
-        if not user_id or not api_token:
-            raise RuntimeError(
-                "Missing credentials. Set QUANTCONNECT_USER_ID and "
-                "QUANTCONNECT_API_TOKEN environment variables."
-            )
+        return await self.connect()
 
-        # Build Docker command
-        args = ["run", "-i", "--rm"]
-        if platform := os.getenv("DOCKER_PLATFORM"):
-            args += ["--platform", platform]
-        args += [
-            "-e", f"QUANTCONNECT_USER_ID={user_id}",
-            "-e", f"QUANTCONNECT_API_TOKEN={api_token}",
-            "quantconnect/mcp-server"
-        ]
+    async def __aexit__(self, *exc_info):
+        await self.disconnect(*exc_info)
+
+    async def connect(self) -> "QCMCPConnection":
+        """Start the MCP server and session. No-op if already connected."""
+        if self.session is not None:
+            return self
+
+        if self.shared:
+            owner = await _acquire_shared(self.init_timeout, self.tool_timeout)
+            self.session = owner.session
+            self.tools = owner.tools
+            self.tools_by_name = owner.tools_by_name
+            self.cache = owner.cache
+            return self
 
-        # Start Docker container
+        user_id, api_token = settings.require_qc_credentials()
+
+        # Start Docker container, or exec into the long-lived one
         try:
-            self._stdio_context = stdio_client(
+            if settings.reuse_mcp_container:
+                args = await _reusable_container_args(user_id, api_token)
+            else:
+                args = ["run", "-i", "--rm"]
+                if platform := settings.docker_platform:
+                    args += ["--platform", platform]
+                args += [
+                    "-e", f"QUANTCONNECT_USER_ID={user_id}",
+                    "-e", f"QUANTCONNECT_API_TOKEN={api_token}",
+                    "quantconnect/mcp-server"
+                ]
+            stdio_context = stdio_client(
                 StdioServerParameters(command="docker", args=args)
             )
-            read, write = await self._stdio_context.__aenter__()
+            read, write = await stdio_context.__aenter__()
         except FileNotFoundError:
             raise RuntimeError("Docker not found. Ensure Docker is installed and running.")
         except Exception as e:
             raise RuntimeError(f"Failed to start MCP container: {e}")
+        self._stdio_context = stdio_context
 
-        # Initialize MCP session
+        # Initialize MCP session and load tools. self.session is only set once
+        # both succeed, so a failed connect() can be retried; on any failure
+        # the session and the container are torn down.
         try:
-            self._session_context = ClientSession(read, write)
-            self.session = await self._session_context.__aenter__()
-            await asyncio.wait_for(self.session.initialize(), timeout=self.init_timeout)
-        except asyncio.TimeoutError:
-            raise RuntimeError(
-                f"MCP session initialization timed out ({self.init_timeout}s). "
-                "Check network and container status."
-            )
+            session_context = ClientSession(read, write)
+            session = await session_context.__aenter__()
+            self._session_context = session_context
+            await asyncio.wait_for(session.initialize(), timeout=self.init_timeout)
+            tools = [
+                ToolInfo(t.name, t.description or "", t.inputSchema or {})
+                for t in (await session.list_tools()).tools
+            ]
+        except BaseException as e:
+            await self.disconnect()
+            if isinstance(e, asyncio.TimeoutError):
+                raise RuntimeError(
+                    f"MCP session initialization timed out ({self.init_timeout}s). "
+                    "Check network and container status."
+                ) from e
+            raise
+
+        self.tools = tools
+        self.tools_by_name = {t.name: t for t in tools}
+        self.session = session
 
-        # Load available tools
-        self.tools = [
-            ToolInfo(t.name, t.description or "", t.inputSchema or {})
-            for t in (await self.session.list_tools()).tools
-        ]
-        self.tools_by_name = {t.name: t for t in self.tools}
-        
         return self
 
-    async def __aexit__(self, *exc_info):
-        for ctx in (self._session_context, self._stdio_context):
+    async def disconnect(self, *exc_info):
+        """Close the session and stop the MCP server. No-op if not connected."""
+        if self.shared:
+            # The shared session stays open for the next run
+            self.session = None
+            return
+        if not exc_info:
+            exc_info = (None, None, None)
+        session_context, stdio_context = self._session_context, self._stdio_context
+        self.session = self._session_context = self._stdio_context = None
+        for ctx in (session_context, stdio_context):
             if ctx:
                 try:
                     await ctx.__aexit__(*exc_info)
@@ -91,42 +218,183 @@ class QCMCPConnection:
                 except Exception:
                     pass
 
-    async def call_tool(self, name: str, arguments: dict[str, Any]) -> str:
-        """Execute an MCP tool with timeout protection."""
+    async def _invoke(self, name: str, arguments: dict[str, Any]):
+        """Run one MCP tool call with timeout protection."""
         if not self.session:
             raise RuntimeError("MCP session not initialized")
-        
         try:
-            result = await asyncio.wait_for(
+            return await asyncio.wait_for(
                 self.session.call_tool(name, arguments=arguments),
                 timeout=self.tool_timeout
             )
         except asyncio.TimeoutError:
             raise RuntimeError(f"Tool '{name}' timed out after {self.tool_timeout}s")
+        finally:
+            if name in WRITE_TOOLS:
+                self.cache.invalidate(arguments)
+
+    async def call_tool(self, name: str, arguments: dict[str, Any]) -> str:
+        """Execute an MCP tool with timeout protection; read-only tools are cached."""
+        if not self.session:
+            raise RuntimeError("MCP session not initialized")
+
+        cache_key = None
+        if name in READ_ONLY_TOOLS:
+            cache_key = self.cache.key(name, arguments)
+            if (cached := self.cache.get(cache_key)) is not None:
+                return cached
+
+        result = await self._invoke(name, arguments)
         
         if not result.content:
             return ""
         
-        # MCP response may contain various types of content
-        chunks = []
-        for block in result.content:
-            if text := getattr(block, "text", None):
-                chunks.append(text)
-            elif (data := getattr(block, "data", None)) is not None:
-                chunks.append(json.dumps(data) if isinstance(data, (dict, list)) else str(data))
-            elif hasattr(block, "model_dump_json"):
-                chunks.append(block.model_dump_json())
-            else:
-                chunks.append(str(block))
+        text = await _serialize_content_async(result.content)
+        if cache_key is not None and not result.isError and not text.startswith("Error executing tool"):
+            self.cache.put(name, arguments, cache_key, text)
+        return text
+
+    async def call_tools_batch(self, calls: list[tuple[str, dict[str, Any]]]) -> list[str]:
+        """Run independent tool calls concurrently; results keep the input order."""
+        return list(await asyncio.gather(*(self.call_tool(name, arguments) for name, arguments in calls)))
+
+    async def call_tool_json(self, name: str, arguments: dict[str, Any]) -> Any:
+        """
+        Execute an MCP tool and return its response already decoded.
         
-        return "\n".join(chunks)
+        A single JSON text block is parsed once, and a single dict/list data
+        block is returned as-is (no dumps/loads round-trip). Anything else
+        comes back as the joined string from call_tool. Bypasses the response
+        cache, so it suits polling live state.
+        """
+        result = await self._invoke(name, arguments)
+        if len(result.content) == 1:
+            block = result.content[0]
+            if isinstance(block, TextContent):
+                if not result.isError:
+                    # Lets orders/insights of a finished backtest be cached
+                    self.cache.note_terminal(name, arguments, block.text)
+                try:
+                    return jsonio.loads(block.text)
+                except jsonio.JSONDecodeError:
+                    return block.text
+            if isinstance(data := getattr(block, "data", None), (dict, list)):
+                return data
+        return await _serialize_content_async(result.content)
     
+    def get_tools_cached(self) -> list[ToolInfo]:
+        """Tools fetched by connect(); no round-trip to the server."""
+        return self.tools
+
     async def health_check(self) -> bool:
         """Verify MCP connection is responsive."""
         if not self.session:
             return False
         try:
-            await asyncio.wait_for(self.session.list_tools(), timeout=5.0)
+            # A ping is enough for liveness; the tool list is fixed after connect()
+            await asyncio.wait_for(self.session.send_ping(), timeout=5.0)
             return True
         except (asyncio.TimeoutError, Exception):
-            return False
\ No newline at end of file
+            return False
+
+
+# Process-wide warm connection. stdio_client must be entered and exited in the
+# same task, so a dedicated task owns the connection for its whole lifetime.
+_shared_lock = asyncio.Lock()
+_shared_owner: QCMCPConnection | None = None
+_shared_stop: asyncio.Event | None = None
+_shared_task: asyncio.Task | None = None
+
+
+async def _acquire_shared(init_timeout: float, tool_timeout: float) -> QCMCPConnection:
+    """Return the live shared connection, (re)starting it if needed."""
+    global _shared_owner, _shared_stop, _shared_task
+    async with _shared_lock:
+        if _shared_owner is not None and await _shared_owner.health_check():
+            return _shared_owner
+        await _close_shared()
+
+        conn = QCMCPConnection(init_timeout, tool_timeout)
+        ready = asyncio.get_running_loop().create_future()
+        stop = asyncio.Event()
+
+        async def _hold():
+            try:
+                async with conn:
+                    ready.set_result(None)
+                    await stop.wait()
+            except Exception as e:
+                if not ready.done():
+                    ready.set_exception(e)
+                else:
+                    logger.warning("Shared MCP connection closed with error: %s", e)
+            finally:
+                if not ready.done():
+                    ready.cancel()
+
+        task = asyncio.create_task(_hold())
+        await ready
+        _shared_owner, _shared_stop, _shared_task = conn, stop, task
+        return conn
+
+
+async def _close_shared():
+    global _shared_owner, _shared_stop, _shared_task
+    if _shared_task is not None:
+        _shared_stop.set()
+        await _shared_task
+    _shared_owner = _shared_stop = _shared_task = None
+
+
+async def close_shared_connection():
+    """Shut down the shared MCP connection, if one is running."""
+    async with _shared_lock:
+        await _close_shared()
+
+
+class QCMCPConnectionPool:
+    """Hands out connections that all share one warm MCP session.
+
+    start() pre-warms the shared session (Docker start, initialize, tool list)
+    so the first acquire() is immediate; every acquire() re-checks liveness
+    and transparently restarts a dead session. All handles share one
+    response cache. Use as an async context manager to close the session on
+    exit.
+    """
+
+    def __init__(self, init_timeout: float = 30.0, tool_timeout: float = 120.0):
+        self.init_timeout = init_timeout
+        self.tool_timeout = tool_timeout
+
+    async def __aenter__(self) -> "QCMCPConnectionPool":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def start(self) -> None:
+        """Bring the shared session up ahead of the first acquire()."""
+        await _acquire_shared(self.init_timeout, self.tool_timeout)
+
+    async def acquire(self) -> QCMCPConnection:
+        """Return a connected handle on the shared session."""
+        conn = QCMCPConnection(self.init_timeout, self.tool_timeout, shared=True)
+        return await conn.connect()
+
+    async def release(self, conn: QCMCPConnection) -> None:
+        """Return a handle; the shared session itself stays open."""
+        await conn.disconnect()
+
+    @contextlib.asynccontextmanager
+    async def connection(self):
+        """acquire()/release() as an async context manager."""
+        conn = await self.acquire()
+        try:
+            yield conn
+        finally:
+            await self.release(conn)
+
+    async def close(self) -> None:
+        """Shut down the shared session."""
+        await close_shared_connection()
@@ -1,8 +1,52 @@
 """Parsing utilities for code extraction and error handling."""
 
-import json
 import re
 
+from . import jsonio
+
+_PY_FENCE_TAG = "```python"
+_PY_FENCE_RE = re.compile(r"```python\s*\n(.*?)```", re.DOTALL)
+_GENERIC_FENCE_RE = re.compile(r"```\s*\n(.*?)```", re.DOTALL)
+# First line that, once stripped, starts like Python code. [^\S\n] is any
+# whitespace except the newline; the trailing \S mirrors str.strip() dropping
+# the keyword's space on an otherwise empty line.
+_CODE_START_RE = re.compile(r"^[^\S\n]*(?:from|import|class|def) [^\n]*?\S", re.MULTILINE)
+
+# Raw-text fallback for compile responses that are not JSON
+_ERROR_PATTERNS = tuple(
+    re.compile(pattern, re.IGNORECASE)
+    for pattern in (
+        r"error[:\s]+(.+?)(?:\n|$)",
+        r"Error[:\s]+(.+?)(?:\n|$)",
+        r"CS\d+[:\s]+(.+?)(?:\n|$)",
+        r"line \d+[:\s]+(.+?)(?:\n|$)",
+    )
+)
+
+
+def _find_python_fence(text: str) -> str | None:
+    """
+    Locate a ```python fenced block with plain str.find calls.
+    
+    Falls back to the regex only when the opening fence carries extra text
+    after the language tag (e.g. ```python title="main.py").
+    """
+    start = text.find(_PY_FENCE_TAG)
+    if start == -1:
+        return None
+    tag_end = start + len(_PY_FENCE_TAG)
+    body_start = text.find("\n", tag_end)
+    if body_start == -1:
+        return None
+    if text[tag_end:body_start].strip():
+        match = _PY_FENCE_RE.search(text)
+        return match.group(1).strip() if match else None
+    end = text.find("```", body_start + 1)
+    if end == -1:
+        return None
+    return text[body_start + 1:end].strip()
+
+
 def extract_python_code(text: str) -> str | None:
     """
     Extract the first Python code block from markdown text.
@@ -14,31 +58,22 @@ def extract_python_code(text: str) -> str | None:
         Extracted Python code or None if not found
     """
     # Try explicit python fence first
-    match = re.search(r"```python\s*\n(.*?)```", text, re.DOTALL)
-    if match:
-        return match.group(1).strip()
+    code = _find_python_fence(text)
+    if code is not None:
+        return code
     
     # Try generic fence
-    match = re.search(r"```\s*\n(.*?)```", text, re.DOTALL)
+    match = _GENERIC_FENCE_RE.search(text)
     if match:
         code = match.group(1).strip()
         # Verify it looks like Python
         if any(kw in code for kw in ["def ", "class ", "import ", "from "]):
             return code
     
-    # Fallback: try to find code without fences
-    lines = text.split('\n')
-    code_lines = []
-    in_code = False
-    
-    for line in lines:
-        if line.strip().startswith(('from ', 'import ', 'class ', 'def ')):
-            in_code = True
-        if in_code:
-            code_lines.append(line)
-    
-    if code_lines:
-        result = '\n'.join(code_lines).strip()
+    # Fallback: take everything from the first code-looking line onward
+    match = _CODE_START_RE.search(text)
+    if match:
+        result = text[match.start():].strip()
         if "QCAlgorithm" in result or "AlgorithmImports" in result:
             return result
     
@@ -57,49 +92,41 @@ def extract_compile_errors(raw_response: str) -> list[str]:
     """
     errors = []
     
-    try:
-        data = json.loads(raw_response)
-        
-        if isinstance(data, dict):
-            # Direct errors field
-            if "errors" in data:
-                err_list = data["errors"]
-                if isinstance(err_list, list):
-                    errors.extend(str(e) for e in err_list)
-                elif isinstance(err_list, str):
-                    errors.append(err_list)
-            
-            # Nested in compile result
-            if "compile" in data and isinstance(data["compile"], dict):
-                if "logs" in data["compile"]:
-                    errors.extend(data["compile"]["logs"])
-            
-            # Error/message fields
-            if "error" in data:
-                errors.append(str(data["error"]))
-            if "message" in data and "error" in str(data.get("state", "")).lower():
-                errors.append(str(data["message"]))
-                
-    except json.JSONDecodeError:
+    # Only an object or array can carry structured errors; plain text skips
+    # straight to the patterns instead of raising and catching a decode error
+    data = None
+    if raw_response.lstrip()[:1] in ("{", "["):
+        try:
+            data = jsonio.loads(raw_response)
+        except jsonio.JSONDecodeError:
+            pass
+
+    if data is None:
         # Extract error patterns from raw text
-        error_patterns = [
-            r"error[:\s]+(.+?)(?:\n|$)",
-            r"Error[:\s]+(.+?)(?:\n|$)",
-            r"CS\d+[:\s]+(.+?)(?:\n|$)",
-            r"line \d+[:\s]+(.+?)(?:\n|$)",
-        ]
-        for pattern in error_patterns:
-            matches = re.findall(pattern, raw_response, re.IGNORECASE)
-            errors.extend(matches)
-    
-    # Deduplicate while preserving order
-    seen = set()
-    unique_errors = []
-    for e in errors:
-        e_clean = e.strip()
-        if e_clean and e_clean not in seen:
-            seen.add(e_clean)
-            unique_errors.append(e_clean)
+        for pattern in _ERROR_PATTERNS:
+            errors.extend(pattern.findall(raw_response))
+    elif isinstance(data, dict):
+        # Direct errors field
+        if "errors" in data:
+            err_list = data["errors"]
+            if isinstance(err_list, list):
+                errors.extend(str(e) for e in err_list)
+            elif isinstance(err_list, str):
+                errors.append(err_list)
+
+        # Nested in compile result
+        if "compile" in data and isinstance(data["compile"], dict):
+            if "logs" in data["compile"]:
+                errors.extend(data["compile"]["logs"])
+
+        # Error/message fields
+        if "error" in data:
+            errors.append(str(data["error"]))
+        if "message" in data and "error" in str(data.get("state", "")).lower():
+            errors.append(str(data["message"]))
+
+    # Deduplicate while preserving order (dicts keep insertion order)
+    unique_errors = list(dict.fromkeys(filter(None, (e.strip() for e in errors))))
     
     return unique_errors if unique_errors else ["Compilation failed - no specific error extracted"]
 
@@ -118,18 +145,21 @@ def extract_compile_errors(raw_response: str) -> list[str]:
 #     return escaped[1:-1]  # Remove surrounding quotes
 
 
-# def truncate_text(text: str, limit: int = 20000) -> str:
-#     """
-#     Truncate text to a character limit, keeping beginning and end.
+def truncate_text(text: str, limit: int = 20000) -> str:
+    """
+    Truncate text to a character limit, keeping beginning and end.
     
-#     Args:
-#         text: Text to truncate
-#         limit: Maximum character count
+    Args:
+        text: Text to truncate
+        limit: Maximum character count
         
-#     Returns:
-#         Truncated text with middle ellipsis if needed
-#     """
-#     if len(text) <= limit:
-#         return text
-#     half = limit // 2
-#     return f"{text[:half]}\n...[truncated]...\n{text[-half:]}"
\ No newline at end of file
+    Returns:
+        Truncated text with middle ellipsis if needed
+    """
+    if len(text) <= limit:
+        return text
+    half = limit // 2
+    if half <= 0:
+        # No room for a head and tail (text[-0:] would be the whole string)
+        return text[:max(limit, 0)]
+    return f"{text[:half]}\n...[truncated {len(text) - 2 * half} chars]...\n{text[-half:]}"
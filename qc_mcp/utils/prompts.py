@@ -1,59 +1,119 @@
-"""Dynamic prompt builders to easily iterate through agent interactions."""
+"""Dynamic prompt builders to easily iterate through agent interactions.
 
-import json
-from strategy_agents.templates import QC_API_REFERENCE
+Each prompt starts with its static text and ends with the per-call data
+(spec, errors, code), so retries share the longest possible prefix and the
+model provider's prompt cache can reuse it.
+"""
+
+import functools
+import textwrap
+from itertools import islice
+from typing import Iterable
+
+from config import OPENAI_MODEL
+
+from . import jsonio
+from .parsing import truncate_text
+
+
+# Bodies are indented in source for readability; dedent once here so the
+# indentation is not sent as tokens on every request
+_CODE_PREFIX = textwrap.dedent("""\
+    Produce complete, compilable QuantConnect Python code following the template and patterns in your instructions.
+
+    Implement this strategy specification:
+    """)
 
 
 def build_code_prompt(spec_text: str, max_spec_length: int = 8000) -> str:
-    
-    return f"""Implement this strategy specification:
-    {spec_text}
-    Produce complete, compilable QuantConnect Python code following the template and patterns in your instructions."""
-
-# To fix compilation errors
-def build_compile_retry_prompt(code: str, errors: list[str]) -> str:
-    
-    error_text = "\n".join(f"  - {e}" for e in errors[:10])  # Limit to 10 errors
-    
-    return f"""Your previous code failed to compile. Fix the errors while preserving strategy logic.
-
-    **Compilation Errors:**
-    {error_text}
-
-    **Your Code:**
-    ```python
-    {code}
-    ```
 
-    **API Reference (follow exactly):**
-    {QC_API_REFERENCE}
+    return _CODE_PREFIX + truncate_text(spec_text, max_spec_length)
+
 
+# To fix compilation errors; the API reference goes between the two halves
+_COMPILE_RETRY_HEAD = textwrap.dedent("""\
+    Your previous code failed to compile. Fix the errors while preserving strategy logic.
+
+    **API Reference (follow exactly):**
+    """)
+# Advisory sections are named constants so the static text lives in one place
+# and each prefix below is a plain concatenation, built once
+_COMMON_FIXES = textwrap.dedent("""\
     **Common Fixes:**
     - Option chain: Use `data.OptionChains.get(symbol)` not `data.OptionChains[symbol]`
     - Greeks: Always check `if c.Greeks and c.Greeks.Delta is not None`
     - Imports: Use only `from AlgorithmImports import *`
     - Time: Use `self.Time` not `datetime.now()`
+    """)
+_COMPILE_RETRY_RETURN = "\nReturn the complete fixed code in a single ```python``` block. Do not explain the changes.\n"
+
+
+@functools.cache
+def _compile_retry_prefix() -> str:
+    # Built on first retry so the templates module and the API reference are
+    # only loaded when needed; strip its framing newlines once here
+    from strategy_agents.templates import get_api_reference
+
+    return "".join((
+        _COMPILE_RETRY_HEAD, get_api_reference().strip(), "\n\n", _COMMON_FIXES, _COMPILE_RETRY_RETURN,
+    ))
+
+
+# Fragments around the per-call values; each builder joins its parts in one
+# pass instead of formatting a tail and then concatenating it to the prefix
+_COMPILE_ERRORS_HEADER = "\n**Compilation Errors:**\n"
+
+
+def _code_block(label: str, code: str) -> tuple[str, ...]:
+    # Every prompt ends with the code in the same fenced layout, after all
+    # static and per-call context, so the code is always the final suffix
+    return ("\n\n**", label, ":**\n```python\n", code, "\n```")
+
+
+def build_compile_retry_prompt(code: str, errors: Iterable[str]) -> str:
+    # code is never truncated: the agent must return the complete file
+
+    # Only the first 10 errors are shown, so only they belong in the cache key;
+    # islice also lets callers pass a generator
+    return _build_compile_retry_prompt(code, tuple(islice(errors, 10)))
+
+
+# Retries often repeat the same (code, errors); reuse the assembled prompt
+@functools.lru_cache(maxsize=32)
+def _build_compile_retry_prompt(code: str, errors: tuple[str, ...]) -> str:
+
+    return _compile_retry_prefix() + _compile_retry_tail(code, errors)
+
 
-    Return the complete fixed code in a single ```python``` block. Do not explain the changes."""
+def _compile_retry_tail(code: str, errors: tuple[str, ...]) -> str:
+    error_text = "\n".join(f"  - {e}" for e in errors)
 
-def build_zero_trades_prompt(code: str, backtest_info: dict | None = None) -> str:
-    info_text = json.dumps(backtest_info, indent=2) if backtest_info else "No additional info"
-    
-    return f"""The code compiles but generated 0 trades.
+    return "".join((
+        _COMPILE_ERRORS_HEADER, error_text,
+        *_code_block("Your Code", code),
+    ))
 
+
+def build_compile_retry_messages(code: str, errors: Iterable[str]) -> list[dict[str, str]]:
+    # Same text as build_compile_retry_prompt, split into chat messages for a
+    # direct chat completions call: the static instructions and API reference
+    # form the system message (identical on every retry), and only the errors
+    # and code go in the user message. The agent pipeline keeps using the str
+    # builder, since Runner.run takes one input and the agent owns the system role.
+    tail = _compile_retry_tail(code, tuple(islice(errors, 10)))
+
+    return [
+        {"role": "system", "content": _compile_retry_prefix().strip()},
+        {"role": "user", "content": tail.lstrip("\n")},
+    ]
+
+
+_ZERO_TRADES_GUIDE = textwrap.dedent("""\
     **Most Likely Causes:**
     1. Greeks are None - code returns early without fallback
     2. No contracts match criteria - filters too restrictive
     3. Chain empty in scheduled function - not using cached contracts
 
-    **Backtest Info:**
-    {info_text}
-
-    **Current Code:**
-    ```python
-    {code}
-    ```
-
     **Required Fixes:**
 
     1. Add strike-based fallback when Greeks unavailable:
@@ -64,7 +124,7 @@ def build_zero_trades_prompt(code: str, backtest_info: dict | None = None) -> st
 
     # Add fallback:
     if not contracts_with_greeks:
-        self.Debug(f"{{self.Time}}: No Greeks, using strike-based selection")
+        self.Debug(f"{self.Time}: No Greeks, using strike-based selection")
         underlying = self.Securities[self.spx.Symbol].Price
         # Select ~5% OTM by strike distance
         otm_puts = [c for c in puts if c.Strike < underlying * 0.95]
@@ -73,32 +133,103 @@ def build_zero_trades_prompt(code: str, backtest_info: dict | None = None) -> st
 
     2. Add debug logging at every decision point:
     ```python
-    self.Debug(f"{{self.Time}}: {{len(contracts)}} contracts, {{len(puts)}} puts, {{len(calls)}} calls")
-    self.Debug(f"{{self.Time}}: {{len(with_greeks)}} have Greeks")
+    self.Debug(f"{self.Time}: {len(contracts)} contracts, {len(puts)} puts, {len(calls)} calls")
+    self.Debug(f"{self.Time}: {len(with_greeks)} have Greeks")
     ```
 
     3. Verify using cached contracts (not CurrentSlice) in TryEntry
 
     4. Ensure orders use contract.Symbol (not strings)
+    """)
+_ZERO_TRADES_PREFIX = "".join((
+    "The code compiles but generated 0 trades.\n\n",
+    _ZERO_TRADES_GUIDE,
+    "\nReturn the complete revised code in a single ```python``` block.\n",
+))
 
-    Return the complete revised code in a single ```python``` block."""
 
+_BACKTEST_INFO_HEADER = "\n**Backtest Info:**\n"
+_NO_INFO = "No additional info"
 
-def build_exec_prompt(project_name: str, file_name: str, code: str, project_id: str | None = None) -> str:
-    if project_id:
-        project_info = f'**Project ID:** {project_id} (use this for all operations)'
-    else:
-        project_info = f'**Project Name:** "{project_name}" (create if not exists, then reuse projectId)'
-    
-    return f"""Deploy and test this code on QuantConnect.
 
-    {project_info}
-    **File:** "{file_name}"
+def build_zero_trades_prompt(code: str, backtest_info: dict | None = None, max_info_length: int = 16000) -> str:
+    # The serialized info doubles as the hashable cache key; only the info is
+    # clipped, since the agent must return the complete code
+    info_text = jsonio.dumps(backtest_info, indent=True) if backtest_info else _NO_INFO
 
-    **Code:**
-    ```python
-    {code}
-    ```
+    return _build_zero_trades_prompt(code, info_text, max_info_length)
+
+
+@functools.lru_cache(maxsize=32)
+def _build_zero_trades_prompt(code: str, info_text: str, max_info_length: int) -> str:
+
+    return "".join((
+        _ZERO_TRADES_PREFIX,
+        _BACKTEST_INFO_HEADER, truncate_text(info_text, max_info_length),
+        *_code_block("Current Code", code),
+    ))
+
+
+_EXEC_PREFIX = textwrap.dedent("""\
+    Deploy and test this code on QuantConnect.
 
     Follow your workflow: verify/create project → upload code → compile → backtest → report results.
-    Call `submit_exec_result()` exactly once when finished."""
\ No newline at end of file
+    Call `submit_exec_result()` exactly once when finished.
+    """)
+
+
+_FILE_HEADER = '\n**File:** "'
+_PROJECT_ID_TMPL = '**Project ID:** {} (use this for all operations)'
+_PROJECT_NAME_TMPL = '**Project Name:** "{}" (create if not exists, then reuse projectId)'
+
+
+def build_exec_prompt(project_name: str, file_name: str, code: str, project_id: str | None = None) -> str:
+    # code is never truncated here: the Exec Agent uploads it verbatim
+    if project_id:
+        project_info = _PROJECT_ID_TMPL.format(project_id)
+    else:
+        project_info = _PROJECT_NAME_TMPL.format(project_name)
+
+    return _build_exec_prompt(project_info, file_name, code)
+
+
+# Unchanged code is redeployed on revision attempts; reuse the rendered prompt.
+# Keyed on the code string itself: its hash is cached on the object, and a
+# separate digest map would retain the same code anyway.
+@functools.lru_cache(maxsize=16)
+def _build_exec_prompt(project_info: str, file_name: str, code: str) -> str:
+
+    return "".join((
+        _EXEC_PREFIX, "\n", project_info,
+        _FILE_HEADER, file_name, '"',
+        *_code_block("Code", code),
+    ))
+
+
+def build_batch_exec_prompts(
+    items: Iterable[tuple[str, ...]], model: str = OPENAI_MODEL
+) -> bytes:
+    """
+    Render exec prompts as a Batch API input file (one JSON request per line).
+
+    Args:
+        items: build_exec_prompt arguments per request:
+            (project_name, file_name, code[, project_id])
+        model: Model named in every request body
+
+    Returns:
+        JSONL bytes; line i has custom_id "req-{i}" so results can be matched
+        back to items
+    """
+    return b"".join(
+        jsonio.dumps_bytes({
+            "custom_id": f"req-{i}",
+            "method": "POST",
+            "url": "/v1/chat/completions",
+            "body": {
+                "model": model,
+                "messages": [{"role": "user", "content": build_exec_prompt(*item)}],
+            },
+        }) + b"\n"
+        for i, item in enumerate(items)
+    )
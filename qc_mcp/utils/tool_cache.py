@@ -0,0 +1,95 @@
+"""In-process LRU + TTL cache for read-only MCP tool responses."""
+
+import json
+import re
+import time
+from collections import OrderedDict
+from typing import Any
+
+# Polled tools are only cached once they report a terminal state
+_TERMINAL_MARKERS = {
+    "read_compile": re.compile(r"BuildSuccess|BuildError"),
+    "read_backtest": re.compile(r'"completed"\s*:\s*true|"status"\s*:\s*"(?:Completed|Runtime Error)', re.IGNORECASE),
+}
+
+
+# Partial while the backtest runs, so only cached once it is known terminal
+_BACKTEST_LIST_TOOLS = frozenset({"read_backtest_orders", "read_backtest_insights"})
+
+
+def _model_value(arguments: dict[str, Any], name: str) -> str | None:
+    # Normalized to str: agents send ids both as 123 and "123"
+    model = arguments.get("model")
+    value = arguments.get(name)
+    if value is None and isinstance(model, dict):
+        value = model.get(name)
+    return None if value is None else str(value)
+
+
+def _project_id(arguments: dict[str, Any]) -> str | None:
+    return _model_value(arguments, "projectId")
+
+
+class ToolResultCache:
+    """
+    Bounded LRU cache with per-entry TTL, keyed by (tool, generations, args).
+    
+    Writes bump the project's generation counter, or the global one when they
+    name no project, so reads issued before a write can never be served after it.
+    """
+
+    def __init__(self, maxsize: int = 256, ttl: float = 300.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: OrderedDict[tuple, tuple[float, str]] = OrderedDict()
+        self._generations: dict[str, int] = {}
+        self._global_generation = 0
+        self._terminal_backtests: set[str] = set()
+
+    def key(self, name: str, arguments: dict[str, Any]) -> tuple:
+        """Canonical cache key for a tool call."""
+        generation = self._generations.get(_project_id(arguments), 0)
+        return (name, self._global_generation, generation, json.dumps(arguments, sort_keys=True, default=str))
+
+    def get(self, key: tuple) -> str | None:
+        """Return a fresh cached response, or None."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if time.monotonic() >= expires_at:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def note_terminal(self, name: str, arguments: dict[str, Any], value: str) -> bool:
+        """Return whether a polled response is terminal; remembers finished backtests."""
+        marker = _TERMINAL_MARKERS.get(name)
+        if marker is None:
+            return True
+        if not marker.search(value):
+            return False
+        if name == "read_backtest" and (backtest_id := _model_value(arguments, "backtestId")):
+            self._terminal_backtests.add(backtest_id)
+        return True
+
+    def put(self, name: str, arguments: dict[str, Any], key: tuple, value: str) -> None:
+        """Store a successful response, skipping non-terminal poll results."""
+        if name in _BACKTEST_LIST_TOOLS and _model_value(arguments, "backtestId") not in self._terminal_backtests:
+            return
+        if not self.note_terminal(name, arguments, value):
+            return
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, arguments: dict[str, Any]) -> None:
+        """Invalidate cached reads for the project a write touched."""
+        project_id = _project_id(arguments)
+        if project_id is None:
+            self._global_generation += 1
+            self._entries.clear()
+            return
+        self._generations[project_id] = self._generations.get(project_id, 0) + 1